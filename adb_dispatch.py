@@ -0,0 +1,436 @@
+import re
+import time
+import queue
+import heapq
+import itertools
+import threading
+import subprocess
+from collections import deque
+from contextlib import contextmanager
+
+DEFAULT_PORT = 5037
+
+ERROR_TIMEOUT = "timeout"
+ERROR_OFFLINE = "offline"
+ERROR_FAILED = "failed"
+
+# only the adb client's own errors; device-side shell errors (e.g. "sh: pidof: not found") are not offline
+OFFLINE_PATTERN = re.compile(r"error: (device offline|device (?:'[^']*' )?not found|no devices|"
+                             r"device unauthorized|device still connecting)")
+HEDGED_KINDS = ("exec-out", "devices", "getprop", "dumpsys", "pidof")
+
+PRIORITY_TAP = 0
+PRIORITY_DEFAULT = 1
+PRIORITY_CAPTURE = 2
+
+CAPTURE_COMMANDS = ("screencap", "exec-out", "pull")
+
+
+def command_priority(args):
+    if "input" in args:
+        return PRIORITY_TAP
+    if any(command in args for command in CAPTURE_COMMANDS):
+        return PRIORITY_CAPTURE
+    return PRIORITY_DEFAULT
+
+
+def command_kind(args):
+    args = [arg for arg in args if arg not in ("-P",)]
+    if "-s" in args:
+        index = args.index("-s")
+        args = args[:index] + args[index + 2:]
+    if not args:
+        return "unknown"
+    if args[0] == "shell" and len(args) > 1:
+        return args[1]
+    if args[0] == "exec-out":
+        return "exec-out"
+    return args[0]
+
+
+def device_from_args(args):
+    if "-s" in args:
+        index = args.index("-s")
+        if index + 1 < len(args):
+            return args[index + 1]
+    return None
+
+
+class AdbResult:
+    def __init__(self, output=None, error=None, duration=0.0, detail=""):
+        self.output = output
+        self.error = error
+        self.duration = duration
+        self.detail = detail
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return f"AdbResult(error={self.error!r}, duration={self.duration:.3f})"
+
+
+class LatencyTracker:
+    def __init__(self, window=50, min_samples=5, default_timeout=5.0, min_timeout=2.0, max_timeout=15.0,
+                 timeout_factor=3.0):
+        self.window = window
+        self.min_samples = min_samples
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_factor = timeout_factor
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def record(self, key, duration):
+        with self.lock:
+            self.samples.setdefault(key, deque(maxlen=self.window)).append(duration)
+
+    def percentile(self, key, percent):
+        with self.lock:
+            samples = sorted(self.samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(round(percent / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def timeout_for(self, key):
+        p95 = self.percentile(key, 95)
+        if p95 is None:
+            return self.default_timeout
+        return max(self.min_timeout, min(self.max_timeout, p95 * self.timeout_factor))
+
+    def hedge_delay(self, key):
+        return self.percentile(key, 95)
+
+
+class AdbServer:
+    def __init__(self, port, max_concurrency):
+        self.port = port
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.waiters = []
+        self.devices = set()
+        self.started = port == DEFAULT_PORT
+        self.cond = threading.Condition()
+
+
+class AdbScheduler:
+    def __init__(self, adb_path="adb.exe", ports=(DEFAULT_PORT,), max_concurrency=4):
+        self.adb_path = adb_path
+        self.servers = [AdbServer(port, max_concurrency) for port in ports]
+        self.assignments = {}
+        self.device_stats = {}
+        self.latency = LatencyTracker()
+        self.hedging = True
+        self.hedged = 0
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def _base_command(self, server):
+        if server.port == DEFAULT_PORT:
+            return [self.adb_path]
+        return [self.adb_path, "-P", str(server.port)]
+
+    def _exec(self, server, args, timeout=5):
+        result = self._attempt(self._base_command(server) + list(args), timeout, False)
+        return result.output if result.ok else None
+
+    def _attempt(self, cmd, timeout, binary, procs=None):
+        start = time.time()
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            return AdbResult(None, ERROR_FAILED, time.time() - start, str(e))
+        if procs is not None:
+            procs.append(proc)
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            return AdbResult(None, ERROR_TIMEOUT, time.time() - start)
+        except:
+            return AdbResult(None, ERROR_FAILED, time.time() - start)
+
+        duration = time.time() - start
+        detail = stderr.decode("utf-8", "replace").strip()
+        if proc.returncode != 0:
+            if proc.returncode < 0 and procs is not None:
+                return AdbResult(None, ERROR_FAILED, duration, "cancelled")
+            error = ERROR_OFFLINE if OFFLINE_PATTERN.search(detail.lower()) else ERROR_FAILED
+            return AdbResult(None, error, duration, detail)
+        output = stdout if binary else stdout.decode("utf-8", "replace").strip()
+        return AdbResult(output, None, duration, detail)
+
+    def _hedged(self, cmd, timeout, binary, hedge_delay):
+        results = queue.Queue()
+        procs = []
+        start = time.time()
+
+        def attempt():
+            remaining = max(0.1, timeout - (time.time() - start))
+            results.put(self._attempt(cmd, remaining, binary, procs))
+
+        threading.Thread(target=attempt, daemon=True).start()
+        pending = 1
+        try:
+            if hedge_delay is not None:
+                try:
+                    result = results.get(timeout=hedge_delay)
+                    pending -= 1
+                    if result.ok or result.error == ERROR_OFFLINE:
+                        return result
+                except queue.Empty:
+                    pass
+                if time.time() - start < timeout:
+                    threading.Thread(target=attempt, daemon=True).start()
+                    pending += 1
+                    self.hedged += 1
+
+            result = None
+            while pending:
+                result = results.get()
+                pending -= 1
+                if result.ok:
+                    break
+            return result
+        finally:
+            for proc in procs:
+                if proc.poll() is None:
+                    try:
+                        proc.kill()
+                    except OSError:
+                        pass
+
+    def _ensure_started(self, server):
+        if not server.started:
+            server.started = self._exec(server, ["start-server"], timeout=15) is not None
+
+    def server_for(self, device):
+        if device is None or len(self.servers) == 1:
+            return self.servers[0]
+        with self.lock:
+            server = self.assignments.get(device)
+            if server is not None:
+                return server
+            server = min(self.servers, key=lambda s: len(s.devices))
+            server.devices.add(device)
+            self.assignments[device] = server
+        self._ensure_started(server)
+        if ":" in device and server.port != DEFAULT_PORT:
+            self._exec(server, ["connect", device])
+        return server
+
+    def _stats(self, device):
+        return self.device_stats.setdefault(device, {
+            'queued': 0,
+            'calls': 0,
+            'total_wait': 0.0,
+            'max_wait': 0.0
+        })
+
+    @contextmanager
+    def slot(self, device=None, priority=PRIORITY_DEFAULT):
+        server = self.server_for(device)
+        key = device or "*"
+        start = time.time()
+        with server.cond:
+            stats = self._stats(key)
+            stats['queued'] += 1
+            entry = (priority, next(self.counter))
+            heapq.heappush(server.waiters, entry)
+            while server.active >= server.max_concurrency or server.waiters[0] != entry:
+                server.cond.wait()
+            heapq.heappop(server.waiters)
+            server.active += 1
+            wait = time.time() - start
+            stats['queued'] -= 1
+            stats['calls'] += 1
+            stats['total_wait'] += wait
+            stats['max_wait'] = max(stats['max_wait'], wait)
+            server.cond.notify_all()
+        try:
+            yield server
+        finally:
+            with server.cond:
+                server.active -= 1
+                server.cond.notify_all()
+
+    def call(self, args, priority=None, timeout=None, binary=False):
+        args = list(args)
+        device = device_from_args(args)
+        kind = command_kind(args)
+        key = (device, kind)
+        if priority is None:
+            priority = command_priority(args)
+        # explicit timeouts (e.g. batched tap sequences with sleeps) are not typical of the key
+        adaptive = timeout is None
+        if adaptive:
+            timeout = self.latency.timeout_for(key)
+        hedge_delay = self.latency.hedge_delay(key) if self.hedging and kind in HEDGED_KINDS else None
+
+        with self.slot(device, priority) as server:
+            cmd = self._base_command(server) + args
+            if hedge_delay is not None:
+                result = self._hedged(cmd, timeout, binary, hedge_delay)
+            else:
+                result = self._attempt(cmd, timeout, binary)
+
+        if adaptive and (result.ok or result.error == ERROR_TIMEOUT):
+            self.latency.record(key, result.duration)
+        return result
+
+    def _read_into(self, cmd, buffer, timeout, procs=None):
+        start = time.time()
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+        except OSError as e:
+            return AdbResult(None, ERROR_FAILED, time.time() - start, str(e))
+        if procs is not None:
+            procs.append(proc)
+        timer = threading.Timer(timeout, proc.kill)
+        timer.start()
+        view = memoryview(buffer)
+        size = 0
+        try:
+            while size < len(view):
+                count = proc.stdout.readinto(view[size:])
+                if not count:
+                    break
+                size += count
+            overflow = size == len(view) and bool(proc.stdout.read(1))
+            if overflow:
+                proc.kill()
+            proc.stdout.close()
+            stderr = proc.stderr.read()
+            proc.wait()
+        finally:
+            timer.cancel()
+            view.release()
+
+        duration = time.time() - start
+        if duration >= timeout:
+            return AdbResult(None, ERROR_TIMEOUT, duration)
+        detail = stderr.decode("utf-8", "replace").strip()
+        if overflow:
+            return AdbResult(None, ERROR_FAILED, duration, "buffer too small")
+        if proc.returncode != 0:
+            if proc.returncode < 0 and procs is not None:
+                return AdbResult(None, ERROR_FAILED, duration, "cancelled")
+            error = ERROR_OFFLINE if OFFLINE_PATTERN.search(detail.lower()) else ERROR_FAILED
+            return AdbResult(None, error, duration, detail)
+        return AdbResult(size, None, duration, detail)
+
+    def _hedged_into(self, cmd, buffers, timeout, hedge_delay):
+        results = queue.Queue()
+        procs = []
+        threads = []
+        start = time.time()
+
+        def attempt(index):
+            remaining = max(0.1, timeout - (time.time() - start))
+            result = self._read_into(cmd, buffers[index], remaining, procs)
+            if result.ok:
+                result.output = (index, result.output)
+            results.put(result)
+
+        def launch(index):
+            thread = threading.Thread(target=attempt, args=(index,), daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        launch(0)
+        pending = 1
+        try:
+            try:
+                result = results.get(timeout=hedge_delay)
+                pending -= 1
+                if result.ok or result.error == ERROR_OFFLINE:
+                    return result
+            except queue.Empty:
+                pass
+            if time.time() - start < timeout:
+                launch(1)
+                pending += 1
+                self.hedged += 1
+
+            result = None
+            while pending:
+                result = results.get()
+                pending -= 1
+                if result.ok:
+                    break
+            return result
+        finally:
+            for proc in procs:
+                if proc.poll() is None:
+                    try:
+                        proc.kill()
+                    except OSError:
+                        pass
+            # the losing reader must stop writing before its buffer is reused
+            for thread in threads:
+                thread.join()
+
+    def call_into(self, args, buffers, priority=None, timeout=None):
+        args = list(args)
+        device = device_from_args(args)
+        kind = command_kind(args)
+        key = (device, kind)
+        if priority is None:
+            priority = command_priority(args)
+        adaptive = timeout is None
+        if adaptive:
+            timeout = self.latency.timeout_for(key)
+        hedge_delay = self.latency.hedge_delay(key) if self.hedging and kind in HEDGED_KINDS else None
+
+        with self.slot(device, priority) as server:
+            cmd = self._base_command(server) + args
+            if hedge_delay is not None and len(buffers) > 1:
+                result = self._hedged_into(cmd, buffers, timeout, hedge_delay)
+            else:
+                result = self._read_into(cmd, buffers[0], timeout)
+                if result.ok:
+                    result.output = (0, result.output)
+
+        if adaptive and (result.ok or result.error == ERROR_TIMEOUT):
+            self.latency.record(key, result.duration)
+        return result
+
+    def run(self, args, priority=None, timeout=None):
+        result = self.call(args, priority, timeout)
+        return result.output if result.ok else None
+
+    def stream(self, args):
+        args = list(args)
+        cmd = self._base_command(self.server_for(device_from_args(args))) + args
+        return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                text=True, encoding="utf-8", errors="replace")
+
+    def devices(self):
+        found = []
+        for server in self.servers:
+            self._ensure_started(server)
+            output = self._exec(server, ["devices"])
+            if not output:
+                continue
+            for line in output.splitlines()[1:]:
+                parts = line.split('\t')
+                if len(parts) == 2 and parts[1] == 'device' and parts[0] not in found:
+                    found.append(parts[0])
+        return found
+
+    def stats(self):
+        report = {}
+        for device, stats in list(self.device_stats.items()):
+            server = self.assignments.get(device, self.servers[0])
+            report[device] = {
+                'port': server.port,
+                'queued': stats['queued'],
+                'calls': stats['calls'],
+                'avg_wait': stats['total_wait'] / stats['calls'] if stats['calls'] else 0.0,
+                'max_wait': stats['max_wait']
+            }
+        return report
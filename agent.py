@@ -0,0 +1,185 @@
+import time
+import json
+import random
+import socket
+import argparse
+import threading
+import socketserver
+
+from main import MEmuController
+from ldplayer import LDPlayerController
+
+CONTROLLERS = {
+    "memu": MEmuController,
+    "ldplayer": LDPlayerController
+}
+
+
+def send_message(sock_file, message):
+    sock_file.write((json.dumps(message) + "\n").encode("utf-8"))
+    sock_file.flush()
+
+
+def read_message(sock_file):
+    line = sock_file.readline()
+    if not line:
+        return None
+    return json.loads(line.decode("utf-8"))
+
+
+class SimulatedController:
+    def __init__(self, device_count, cycle_time, failure_rate=0.0):
+        self.all_devices = [f"sim-{i + 1}" for i in range(device_count)]
+        self.connected_devices = list(self.all_devices)
+        self.cycle_time = cycle_time
+        self.failure_rate = failure_rate
+        self.device_stats = {}
+        self.running = True
+
+    def scan_devices(self):
+        return self.all_devices
+
+    def connect_devices(self, selection):
+        self.connected_devices = list(self.all_devices)
+        return True
+
+    def clear_fog(self):
+        time.sleep(self.cycle_time * random.uniform(0.9, 1.1))
+        for device in self.connected_devices:
+            stats = self.device_stats.setdefault(device, {
+                'runs': 0, 'success': 0, 'failed': 0, 'recoveries': 0, 'watchdog': 0
+            })
+            stats['runs'] += 1
+            stats['success' if random.random() >= self.failure_rate else 'failed'] += 1
+        return self.running
+
+
+class Agent:
+    def __init__(self, controller, name=None):
+        self.controller = controller
+        self.name = name or socket.gethostname()
+        self.pending = 0
+        self.completed = 0
+        self.current = False
+        self.cycle_time = None
+        self.last_cycle_time = None
+        self.lock = threading.Condition()
+        self.worker = threading.Thread(target=self._work, daemon=True)
+        self.worker.start()
+
+    def _work(self):
+        while True:
+            with self.lock:
+                while self.pending <= 0:
+                    self.lock.wait()
+                self.pending -= 1
+                self.current = True
+            start = time.time()
+            try:
+                self.controller.clear_fog()
+            except Exception:
+                pass
+            duration = time.time() - start
+            with self.lock:
+                self.completed += 1
+                self.current = False
+                self.last_cycle_time = duration
+                self.cycle_time = duration if self.cycle_time is None else self.cycle_time * 0.7 + duration * 0.3
+
+    def status(self):
+        with self.lock:
+            return {
+                'ok': True,
+                'name': self.name,
+                'busy': self.pending > 0 or self.current,
+                'running': self.current,
+                'pending': self.pending,
+                'completed': self.completed,
+                'cycle_time': self.cycle_time,
+                'last_cycle_time': self.last_cycle_time,
+                'devices': {device: dict(stats) for device, stats in self.controller.device_stats.items()}
+            }
+
+    def handle(self, message):
+        cmd = message.get('cmd')
+        if cmd == 'hello':
+            return {'ok': True, 'name': self.name, 'devices': list(self.controller.connected_devices)}
+        if cmd == 'status':
+            return self.status()
+        if cmd == 'run':
+            runs = max(0, int(message.get('runs', 1)))
+            with self.lock:
+                self.controller.running = True
+                self.pending += runs
+                self.lock.notify()
+            return {'ok': True, 'accepted': runs}
+        if cmd == 'reclaim':
+            with self.lock:
+                reclaimed = min(self.pending, max(0, int(message.get('runs', self.pending))))
+                self.pending -= reclaimed
+            return {'ok': True, 'reclaimed': reclaimed}
+        if cmd == 'stop':
+            with self.lock:
+                reclaimed = self.pending
+                self.pending = 0
+                self.controller.running = False
+            return {'ok': True, 'reclaimed': reclaimed}
+        return {'ok': False, 'error': f"unknown command: {cmd}"}
+
+
+class AgentHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                message = read_message(self.rfile)
+            except ValueError:
+                send_message(self.wfile, {'ok': False, 'error': 'invalid json'})
+                continue
+            if message is None:
+                break
+            send_message(self.wfile, self.server.agent.handle(message))
+
+
+class AgentServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, agent):
+        super().__init__(address, AgentHandler)
+        self.agent = agent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fog clearing agent for the multi-host coordinator")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=7300)
+    parser.add_argument("--name", help="Agent name reported to the coordinator (default: hostname)")
+    parser.add_argument("--emulator", choices=sorted(CONTROLLERS), default="memu")
+    parser.add_argument("--devices", default="all", help="Devices to connect (1, 1+2+3, all)")
+    parser.add_argument("--simulate", type=int, default=0, help="Run N simulated devices instead of an emulator")
+    parser.add_argument("--cycle-time", type=float, default=2.0, help="Simulated seconds per cycle")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Simulated failure rate per device")
+    args = parser.parse_args()
+
+    if args.simulate > 0:
+        controller = SimulatedController(args.simulate, args.cycle_time, args.failure_rate)
+    else:
+        controller = CONTROLLERS[args.emulator]()
+        controller.scan_devices()
+        if not controller.connect_devices(args.devices):
+            print("No devices connected")
+            return
+
+    agent = Agent(controller, args.name)
+    server = AgentServer((args.host, args.port), agent)
+    print(f"Agent {agent.name} listening on {args.host}:{args.port} with {len(controller.connected_devices)} devices")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
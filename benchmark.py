@@ -0,0 +1,185 @@
+import os
+import time
+import struct
+import argparse
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from matching import FFTMatcher
+from frame_buffers import FrameBuffers
+from recorder import iter_recordings
+
+DEFAULT_TEMPLATES = ["send.png", "explore.png", "scout.png", "home.png", "map.png",
+                     "1.png", "2.png", "3.png", "4.png"]
+
+
+def load_templates(template_dir, names):
+    templates = {}
+    for name in names:
+        template = cv2.imread(os.path.join(template_dir, name))
+        if template is not None:
+            templates[name] = template
+    return templates
+
+
+def synthetic_frame(templates, width=1024, height=576, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    frame = cv2.GaussianBlur(frame, (7, 7), 0)
+    x, y = 10, 10
+    for template in templates.values():
+        h, w = template.shape[:2]
+        if x + w > width:
+            x, y = 10, y + 110
+        if y + h > height:
+            break
+        frame[y:y + h, x:x + w] = template
+        x += w + 10
+    return frame
+
+
+def opencv_find_all(frame, templates):
+    results = {}
+    for name, template in templates.items():
+        result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        results[name] = (max_val, max_loc)
+    return results
+
+
+def fft_find_all(matcher, frame, names):
+    prepared = matcher.prepare_frame(frame)
+    return {name: matcher.best_match(prepared, name) for name in names}
+
+
+def time_it(func, repeat):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run_match_benchmark(frames, templates, repeat):
+    matcher = FFTMatcher()
+    for name, template in templates.items():
+        matcher.add_template(name, template)
+    names = list(templates)
+
+    print(f"Templates: {', '.join(names)}")
+    print(f"Frames: {len(frames)}, repeat: {repeat}")
+    opencv_ms = fft_ms = 0.0
+    max_diff = 0.0
+    loc_mismatch = 0
+    for frame in frames:
+        opencv_ms += time_it(lambda: opencv_find_all(frame, templates), repeat)
+        fft_ms += time_it(lambda: fft_find_all(matcher, frame, names), repeat)
+
+        expected = opencv_find_all(frame, templates)
+        actual = fft_find_all(matcher, frame, names)
+        for name in names:
+            max_diff = max(max_diff, abs(expected[name][0] - actual[name][0]))
+            if expected[name][0] >= 0.8 and expected[name][1] != actual[name][1]:
+                loc_mismatch += 1
+
+    print(f"opencv TM_CCOEFF_NORMED : {opencv_ms / len(frames):8.2f} ms per find_all")
+    print(f"fft NCC (cached spectra): {fft_ms / len(frames):8.2f} ms per find_all")
+    print(f"max score difference    : {max_diff:.6f}")
+    print(f"location mismatches     : {loc_mismatch}")
+
+
+def raw_screencap(frame):
+    height, width = frame.shape[:2]
+    rgba = cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA)
+    return struct.pack("<IIII", width, height, 1, 0) + rgba.tobytes()
+
+
+def buffered_find_all(buffers, raw, templates):
+    buffers.load(raw)
+    frame = buffers.convert()
+    results = {}
+    for name, template in templates.items():
+        shape = (frame.shape[0] - template.shape[0] + 1, frame.shape[1] - template.shape[1] + 1)
+        result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED,
+                                   result=buffers.result_buffer(name, shape))
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        results[name] = (max_val, max_loc)
+    return results
+
+
+def allocated_per_call(func, repeat):
+    func()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    total = 0
+    for _ in range(repeat):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return total / repeat
+
+
+def run_memory_benchmark(frames, templates, repeat):
+    print(f"Templates: {', '.join(templates)}")
+    print(f"Frames: {len(frames)}, repeat: {repeat}")
+    decoded = buffered = 0.0
+    for frame in frames:
+        png = cv2.imencode(".png", frame)[1].tobytes()
+        raw = raw_screencap(frame)
+        height, width = frame.shape[:2]
+        buffers = FrameBuffers(width, height, 16, 1)
+        decoded += allocated_per_call(
+            lambda: opencv_find_all(cv2.imdecode(np.frombuffer(png, np.uint8), cv2.IMREAD_COLOR), templates),
+            repeat)
+        buffered += allocated_per_call(lambda: buffered_find_all(buffers, raw, templates), repeat)
+
+    print(f"png decode + new results  : {decoded / len(frames) / 1024:10.1f} KiB per find_all")
+    print(f"raw capture + reused bufs : {buffered / len(frames) / 1024:10.1f} KiB per find_all")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark template matching engines")
+    parser.add_argument("--frame", help="Screenshot to match against (default: synthetic frame)")
+    parser.add_argument("--corpus", help="Recording archive or directory to replay as benchmark frames")
+    parser.add_argument("--max-frames", type=int, default=50)
+    parser.add_argument("--templates", nargs="*", default=DEFAULT_TEMPLATES)
+    parser.add_argument("--template-dir", default="templates")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--memory", action="store_true", help="Measure allocation per lookup instead of speed")
+    args = parser.parse_args()
+
+    templates = load_templates(args.template_dir, args.templates)
+    if not templates:
+        print("No templates found")
+        return
+
+    if args.corpus:
+        frames = []
+        for frame, _ in iter_recordings(args.corpus):
+            frames.append(frame)
+            if len(frames) >= args.max_frames:
+                break
+        if not frames:
+            print(f"No recorded frames in {args.corpus}")
+            return
+    elif args.frame:
+        frame = cv2.imread(args.frame)
+        if frame is None:
+            print(f"Cannot read {args.frame}")
+            return
+        frames = [frame]
+    else:
+        frames = [synthetic_frame(templates)]
+
+    if args.memory:
+        run_memory_benchmark(frames, templates, args.repeat)
+    else:
+        run_match_benchmark(frames, templates, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import time
+import socket
+import argparse
+import statistics
+
+from colorama import init, Fore, Style
+
+from agent import send_message, read_message
+
+init()
+
+
+class AgentConnection:
+    def __init__(self, address, timeout=5):
+        host, _, port = address.rpartition(":")
+        self.address = address
+        self.host = host or "127.0.0.1"
+        self.port = int(port)
+        self.timeout = timeout
+        self.sock = None
+        self.file = None
+        self.name = address
+        self.status = {}
+        self.assigned = 0
+        self.online = False
+
+    def connect(self):
+        self.close()
+        self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self.file = self.sock.makefile("rwb")
+        reply = self.request({'cmd': 'hello'})
+        self.name = reply.get('name', self.address)
+        self.online = True
+        return reply
+
+    def close(self):
+        self.online = False
+        for item in (self.file, self.sock):
+            try:
+                if item is not None:
+                    item.close()
+            except OSError:
+                pass
+        self.sock = None
+        self.file = None
+
+    def request(self, message):
+        send_message(self.file, message)
+        reply = read_message(self.file)
+        if reply is None:
+            raise ConnectionError(f"{self.address} closed the connection")
+        return reply
+
+    def call(self, message):
+        try:
+            if not self.online:
+                self.connect()
+            return self.request(message)
+        except (OSError, ValueError, ConnectionError):
+            self.close()
+            return None
+
+
+class Coordinator:
+    def __init__(self, addresses, total_runs=0, max_batch=5, slow_factor=2.0, poll_interval=1.0):
+        self.agents = [AgentConnection(address) for address in addresses]
+        self.total_runs = total_runs
+        self.max_batch = max_batch
+        self.slow_factor = slow_factor
+        self.poll_interval = poll_interval
+        self.remaining = total_runs
+        self.completed = 0
+        self.rebalanced = 0
+        self.baseline = {}
+
+    def _unlimited(self):
+        return self.total_runs <= 0
+
+    def poll(self):
+        for agent in self.agents:
+            status = agent.call({'cmd': 'status'})
+            if status is None:
+                if agent.assigned:
+                    self.remaining += agent.assigned
+                    agent.assigned = 0
+                agent.status = {}
+                continue
+            done = status.get('completed', 0) - agent.status.get('completed', status.get('completed', 0))
+            if done > 0:
+                self.completed += done
+            agent.status = status
+            agent.assigned = status.get('pending', 0) + (1 if status.get('running') else 0)
+
+    def _cycle_times(self):
+        return {agent.address: agent.status.get('cycle_time') for agent in self.agents
+                if agent.status.get('cycle_time')}
+
+    def _is_slow(self, agent, cycle_times):
+        own = cycle_times.get(agent.address)
+        baseline = self.baseline.get(agent.address)
+        if own is None:
+            return False
+        if baseline is not None and own > baseline * self.slow_factor:
+            return True
+        others = [value for address, value in cycle_times.items() if address != agent.address]
+        return bool(others) and own > statistics.median(others) * self.slow_factor
+
+    def rebalance(self):
+        cycle_times = self._cycle_times()
+        for agent in self.agents:
+            own = cycle_times.get(agent.address)
+            if own is not None:
+                self.baseline[agent.address] = min(self.baseline.get(agent.address, own), own)
+            if not agent.online or not self._is_slow(agent, cycle_times):
+                continue
+            pending = agent.status.get('pending', 0)
+            if pending > 0:
+                reply = agent.call({'cmd': 'reclaim', 'runs': pending})
+                if reply and reply.get('reclaimed'):
+                    self.remaining += reply['reclaimed']
+                    agent.assigned -= reply['reclaimed']
+                    self.rebalanced += reply['reclaimed']
+                    print(f"{Fore.YELLOW}⚖️ {agent.name}: slowed down, reclaimed {reply['reclaimed']} runs{Style.RESET_ALL}")
+
+    def _batch_size(self, agent, cycle_times):
+        own = cycle_times.get(agent.address)
+        if own is None or not cycle_times:
+            return 1
+        if self._is_slow(agent, cycle_times):
+            return 1
+        fastest = min(cycle_times.values())
+        return max(1, min(self.max_batch, round(self.max_batch * fastest / own)))
+
+    def dispatch(self):
+        cycle_times = self._cycle_times()
+        for agent in self.agents:
+            if not agent.online or agent.assigned > 0:
+                continue
+            if not self._unlimited() and self.remaining <= 0:
+                break
+            runs = self._batch_size(agent, cycle_times)
+            if not self._unlimited():
+                runs = min(runs, self.remaining)
+            reply = agent.call({'cmd': 'run', 'runs': runs})
+            if reply and reply.get('ok'):
+                accepted = reply.get('accepted', 0)
+                agent.assigned += accepted
+                if not self._unlimited():
+                    self.remaining -= accepted
+
+    def finished(self):
+        if self._unlimited():
+            return False
+        return self.remaining <= 0 and all(agent.assigned == 0 for agent in self.agents)
+
+    def metrics(self):
+        agents = {}
+        for agent in self.agents:
+            devices = agent.status.get('devices', {})
+            runs = sum(stats.get('runs', 0) for stats in devices.values())
+            success = sum(stats.get('success', 0) for stats in devices.values())
+            agents[agent.address] = {
+                'name': agent.name,
+                'online': agent.online,
+                'completed': agent.status.get('completed', 0),
+                'pending': agent.status.get('pending', 0),
+                'cycle_time': agent.status.get('cycle_time'),
+                'success_rate': success / runs * 100 if runs else 0.0,
+                'devices': devices
+            }
+        return {'completed': self.completed, 'remaining': self.remaining,
+                'rebalanced': self.rebalanced, 'agents': agents}
+
+    def print_status(self):
+        metrics = self.metrics()
+        total = self.total_runs if self.total_runs > 0 else '∞'
+        print(f"\n{Fore.CYAN}📊 Completed {metrics['completed']}/{total} | Rebalanced {metrics['rebalanced']}{Style.RESET_ALL}")
+        for address, agent in metrics['agents'].items():
+            state = f"{Fore.GREEN}online{Style.RESET_ALL}" if agent['online'] else f"{Fore.RED}offline{Style.RESET_ALL}"
+            cycle = f"{agent['cycle_time']:.1f}s" if agent['cycle_time'] else "-"
+            label = agent['name'] if agent['name'] == address else f"{agent['name']} ({address})"
+            print(f"  {label}: {state} | done {agent['completed']} | queued {agent['pending']} | "
+                  f"cycle {cycle} | ok {agent['success_rate']:.0f}% | {len(agent['devices'])} devices")
+
+    def run(self):
+        for agent in self.agents:
+            if agent.call({'cmd': 'hello'}) is None:
+                print(f"{Fore.RED}⚠️ Cannot reach agent {agent.address}{Style.RESET_ALL}")
+        try:
+            while True:
+                self.poll()
+                self.rebalance()
+                self.dispatch()
+                self.print_status()
+                if self.finished():
+                    break
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            for agent in self.agents:
+                agent.call({'cmd': 'stop'})
+        finally:
+            for agent in self.agents:
+                agent.close()
+        return self.metrics()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distribute fog clearing runs across agent hosts")
+    parser.add_argument("agents", nargs="+", help="Agent addresses (host:port)")
+    parser.add_argument("--runs", type=int, default=0, help="Total runs to distribute (0 for unlimited)")
+    parser.add_argument("--max-batch", type=int, default=5)
+    parser.add_argument("--slow-factor", type=float, default=2.0)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    coordinator = Coordinator(args.agents, args.runs, args.max_batch, args.slow_factor, args.poll_interval)
+    coordinator.run()
+
+
+if __name__ == "__main__":
+    main()
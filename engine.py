@@ -0,0 +1,1415 @@
+import os
+import sys
+import time
+import random
+import json
+import socket
+import logging
+import threading
+import contextlib
+try:
+    from colorama import init, Fore, Back, Style
+    import cv2
+    import numpy as np
+except ImportError:
+    import pip
+    packages = ['colorama', 'opencv-python', 'numpy']
+    for package in packages:
+        pip.main(['install', package])
+    from colorama import init, Fore, Back, Style
+    import cv2
+    import numpy as np
+from matching import FFTMatcher, find_peaks
+from recorder import FrameRecorder
+from adb_dispatch import AdbScheduler, DEFAULT_PORT, ERROR_OFFLINE
+from event_log import EventLogger
+from governor import LoadGovernor
+from frame_buffers import FrameBuffers, parse_raw_header
+from pipeline import DevicePipeline
+from game_events import GameEventMonitor, GAME_DIED, GAME_BACKGROUND, GAME_FOREGROUND
+
+init()
+
+class StepAborted(Exception):
+    pass
+
+class EmulatorController:
+    name = "Emulator"
+    banner = ""
+    probe_host = "127.0.0.1"
+    probe_ports = ()
+
+    def __init__(self):
+        self.adb_path = "adb.exe"
+        self.all_devices = []
+        self.connected_devices = []
+        self.screenshot_dir = "screenshots"
+        self.template_dir = "templates"
+        self.anti_ban_enabled = True
+        self.anti_ban_level = 2
+        self.max_repeats = 0
+        self.rest_interval = 0
+        self.rest_duration = 0
+        self.current_run_count = 0
+        self.running = True
+        self.last_activity_time = time.time()
+        self.activity_pattern = []
+        self.location_memory_file = "location_memory.json"
+        self.location_memory = {}
+        self.search_margin = 40
+        self.memory_lock = threading.Lock()
+        self.match_engine = "opencv"
+        self.fft_matcher = FFTMatcher()
+        self.package_name = "com.rok.gp.vn"
+        self.max_retries = 2
+        self.step_timeout = 60
+        self.ready_timeout = 120
+        self.start_times = {}
+        self.parallel_devices = True
+        self.multi_dispatch = True
+        self.max_dispatch = 4
+        self.batch_delay = 1
+        self.batch_explore_timeout = 8
+        self.batch_taps = True
+        self.idle_detection = True
+        self.idle_backoff_base = 30
+        self.idle_backoff_max = 600
+        self.idle_state = {}
+        self.step_times = {}
+        self.log_verbosity = "normal"
+        self.log_file = None
+        self.json_log_file = None
+        self.log = EventLogger(self.log_verbosity)
+        self.governor = LoadGovernor()
+        self.governor_enabled = True
+        self.in_progress = {}
+        self.raw_capture = True
+        self.pipelined = True
+        self.pipelines = {}
+        self.frame_buffers = {}
+        self.raw_unsupported = set()
+        self.templates = {}
+        self.device_stats = {}
+        self.device_steps = {}
+        self.abort_events = {}
+        self.stats_lock = threading.RLock()
+        self.recorder = None
+        self.adb_ports = [DEFAULT_PORT]
+        self.adb_concurrency = 4
+        self.adb = AdbScheduler(self.adb_path, self.adb_ports, self.adb_concurrency)
+        self.last_adb_error = {}
+        self.event_stream = True
+        self.game_events = {}
+        self.recovering = set()
+        self.game_monitor = GameEventMonitor(self.adb, self.package_name, self._on_game_event)
+        self._load_location_memory()
+        os.makedirs(self.screenshot_dir, exist_ok=True)
+        os.makedirs(self.template_dir, exist_ok=True)
+
+    def _adb_call(self, *args, binary=False, timeout=None):
+        result = self.adb.call(args, binary=binary, timeout=timeout)
+        if "-s" in args:
+            self.last_adb_error[args[args.index("-s") + 1]] = result.error
+        return result
+
+    def _run_adb(self, *args):
+        result = self._adb_call(*args)
+        return result.output if result.ok else None
+
+    def _is_offline(self, device):
+        return self.last_adb_error.get(device) == ERROR_OFFLINE
+
+    def configure_adb(self, ports=None, concurrency=None):
+        if ports:
+            self.adb_ports = list(ports)
+        if concurrency:
+            self.adb_concurrency = concurrency
+        self.adb = AdbScheduler(self.adb_path, self.adb_ports, self.adb_concurrency)
+        self.game_monitor.adb = self.adb
+        print(f"\n{Fore.GREEN}✅ ADB servers {', '.join(map(str, self.adb_ports))} "
+              f"(max {self.adb_concurrency} calls each){Style.RESET_ALL}")
+
+    def _animate_loading(self, message):
+        for i in range(3):
+            for char in "⣾⣽⣻⢿⡿⣟⣯⣷":
+                sys.stdout.write(f"\r{Fore.YELLOW}{char} {message}{' '*(10-len(message))}{Style.RESET_ALL}")
+                sys.stdout.flush()
+                time.sleep(0.1)
+        print("\r" + " "*50 + "\r", end="")
+
+    def _take_screenshot(self, device, filename):
+        try:
+            screenshot_path = os.path.join(self.screenshot_dir, filename)
+            result = self._run_adb("-s", device, "shell", "screencap", "-p", "/sdcard/screen.png")
+            if result is None:
+                return False
+            
+            self._run_adb("-s", device, "pull", "/sdcard/screen.png", screenshot_path)
+            self._run_adb("-s", device, "shell", "rm", "/sdcard/screen.png")
+            
+            try:
+                img = cv2.imread(screenshot_path)
+                if img is None or img.size == 0:
+                    raise ValueError("Empty image")
+                return True
+            except:
+                screenshot_path = os.path.join(self.screenshot_dir, f"alt_{filename}")
+                result = self._run_adb("-s", device, "exec-out", "screencap", "-p", ">", screenshot_path)
+                if result is None:
+                    return False
+                return True
+        except:
+            return False
+
+    def _load_location_memory(self):
+        try:
+            with open(self.location_memory_file, "r", encoding="utf-8") as f:
+                self.location_memory = json.load(f)
+        except:
+            self.location_memory = {}
+
+    def _save_location_memory(self):
+        try:
+            tmp_path = self.location_memory_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.location_memory, f, indent=2)
+            os.replace(tmp_path, self.location_memory_file)
+        except:
+            pass
+
+    def _remember_location(self, device, template_filename, loc):
+        loc = [int(loc[0]), int(loc[1])]
+        with self.memory_lock:
+            device_memory = self.location_memory.setdefault(device, {})
+            if device_memory.get(template_filename) != loc:
+                device_memory[template_filename] = loc
+                self._save_location_memory()
+
+    def _load_template(self, template_filename):
+        template = self.templates.get(template_filename)
+        if template is None:
+            template_path = os.path.join(self.template_dir, template_filename)
+            if not os.path.exists(template_path):
+                return None
+            template = cv2.imread(template_path)
+            if template is not None:
+                self.templates[template_filename] = template
+        return template
+
+    def _screenshot_filename(self, device):
+        safe_name = "".join(c if c.isalnum() else "_" for c in device)
+        return f"current_screen_{safe_name}.png"
+
+    def _capture_raw(self, device):
+        if device in self.raw_unsupported:
+            return None
+        buffers = self.frame_buffers.get(device)
+        if buffers is None:
+            result = self._adb_call("-s", device, "exec-out", "screencap", binary=True)
+            if not result.ok:
+                return None
+            layout = parse_raw_header(result.output)
+            if layout is None:
+                self.raw_unsupported.add(device)
+                return None
+            buffers = FrameBuffers(*layout)
+            buffers.load(result.output)
+            self.frame_buffers[device] = buffers
+            return buffers.convert()
+
+        result = self.adb.call_into(["-s", device, "exec-out", "screencap"], buffers.raws)
+        self.last_adb_error[device] = result.error
+        if not result.ok:
+            return None
+        index, size = result.output
+        if size != len(buffers.raws[index]) or not buffers.valid(index):
+            self.frame_buffers.pop(device, None)
+            return None
+        buffers.active = index
+        return buffers.convert()
+
+    def _capture(self, device):
+        if self.raw_capture:
+            img = self._capture_raw(device)
+            if img is not None or self._is_offline(device):
+                return img
+
+        result = self._adb_call("-s", device, "exec-out", "screencap", "-p", binary=True)
+        if result.ok and result.output:
+            img = cv2.imdecode(np.frombuffer(result.output, np.uint8), cv2.IMREAD_COLOR)
+            if img is not None:
+                return img
+        if result.error == ERROR_OFFLINE:
+            return None
+
+        filename = self._screenshot_filename(device)
+        if not self._take_screenshot(device, filename):
+            return None
+        return cv2.imread(os.path.join(self.screenshot_dir, filename))
+
+    def _match_map(self, device, img, template, key):
+        shape = (img.shape[0] - template.shape[0] + 1, img.shape[1] - template.shape[1] + 1)
+        buffers = self.frame_buffers.get(device)
+        if buffers is None:
+            return cv2.matchTemplate(img, template, cv2.TM_CCOEFF_NORMED)
+        return cv2.matchTemplate(img, template, cv2.TM_CCOEFF_NORMED,
+                                 result=buffers.result_buffer(key, shape))
+
+    def _match_template(self, device, img, template, key):
+        _, max_val, _, max_loc = cv2.minMaxLoc(self._match_map(device, img, template, key))
+        return max_val, max_loc
+
+    def _match_full_frame(self, device, img, template, template_filename, frame_cache=None):
+        if self.match_engine == "fft":
+            if not self.fft_matcher.has_template(template_filename):
+                self.fft_matcher.add_template(template_filename, template)
+            frame = frame_cache.get("fft") if frame_cache is not None else None
+            if frame is None:
+                frame = self.fft_matcher.prepare_frame(img)
+                if frame_cache is not None:
+                    frame_cache["fft"] = frame
+            return self.fft_matcher.best_match(frame, template_filename)
+
+        return self._match_template(device, img, template, template_filename)
+
+    def _locate(self, device, img, template, template_filename, threshold, frame_cache=None, memory_key=None):
+        memory_key = memory_key or template_filename
+        h, w = template.shape[:2]
+        img_h, img_w = img.shape[:2]
+        if h > img_h or w > img_w:
+            return None
+
+        last_loc = self.location_memory.get(device, {}).get(memory_key)
+        if last_loc is not None:
+            x0 = max(0, last_loc[0] - self.search_margin)
+            y0 = max(0, last_loc[1] - self.search_margin)
+            x1 = min(img_w, last_loc[0] + w + self.search_margin)
+            y1 = min(img_h, last_loc[1] + h + self.search_margin)
+            if x1 - x0 >= w and y1 - y0 >= h:
+                start = time.time()
+                max_val, max_loc = self._match_template(device, img[y0:y1, x0:x1], template, memory_key)
+                self.governor.record_latency(("match", template_filename, "window"), time.time() - start)
+                if max_val >= threshold:
+                    loc = (max_loc[0] + x0, max_loc[1] + y0)
+                    self._remember_location(device, memory_key, loc)
+                    return (loc[0] + w // 2, loc[1] + h // 2)
+
+        start = time.time()
+        max_val, max_loc = self._match_full_frame(device, img, template, template_filename, frame_cache)
+        self.governor.record_latency(("match", template_filename, self.match_engine), time.time() - start)
+
+        if max_loc is not None and max_val >= threshold:
+            self._remember_location(device, memory_key, max_loc)
+            return (max_loc[0] + w // 2, max_loc[1] + h // 2)
+        return None
+
+    def _remembered_position(self, device, template_filename, memory_key=None):
+        loc = self.location_memory.get(device, {}).get(memory_key or template_filename)
+        template = self._load_template(template_filename) if loc is not None else None
+        if template is None:
+            return None
+        h, w = template.shape[:2]
+        return (loc[0] + w // 2, loc[1] + h // 2)
+
+    def _find_image(self, device, template_filename, threshold=0.8, memory_key=None):
+        memory_keys = {template_filename: memory_key} if memory_key else None
+        return self._find_all(device, [template_filename], threshold, memory_keys)[template_filename]
+
+    def _find_all(self, device, template_filenames, threshold=0.8, memory_keys=None):
+        self._check_abort(device)
+        found = {name: None for name in template_filenames}
+        start = time.time()
+        img = self._next_frame(device)
+        if img is None:
+            self.log.event(device, "Capture failed", time.time() - start, logging.DEBUG,
+                           error=self.last_adb_error.get(device))
+            return found
+        captured = time.time()
+
+        with self._match_slot(device):
+            frame_cache = {}
+            for name in template_filenames:
+                try:
+                    template = self._load_template(name)
+                    if template is None:
+                        continue
+                    memory_key = memory_keys.get(name) if memory_keys else None
+                    found[name] = self._locate(device, img, template, name, threshold, frame_cache, memory_key)
+                except:
+                    found[name] = None
+        if device not in self.pipelines:
+            self.governor.record_latency("capture", captured - start)
+        if self.recorder is not None:
+            shared = device in self.frame_buffers or device in self.pipelines
+            self.recorder.record(device, img, found, copy=shared)
+        if self.log.enabled(logging.DEBUG):
+            self.log.event(device, "Match " + ", ".join(template_filenames), time.time() - start, logging.DEBUG,
+                           capture=captured - start, match=time.time() - captured,
+                           found=[name for name, pos in found.items() if pos])
+        return found
+
+    def find_all_occurrences(self, device, template_filename, threshold=0.8, max_results=None):
+        self._check_abort(device)
+        template = self._load_template(template_filename)
+        if template is None:
+            return []
+        start = time.time()
+        img = self._next_frame(device)
+        if img is None or template.shape[0] > img.shape[0] or template.shape[1] > img.shape[1]:
+            return []
+        captured = time.time()
+
+        with self._match_slot(device):
+            if self.match_engine == "fft":
+                if not self.fft_matcher.has_template(template_filename):
+                    self.fft_matcher.add_template(template_filename, template)
+                peaks = self.fft_matcher.occurrences(self.fft_matcher.prepare_frame(img), template_filename,
+                                                     threshold, max_results)
+            else:
+                result = self._match_map(device, img, template, template_filename)
+                peaks = find_peaks(result, threshold, template.shape, max_results)
+        if device not in self.pipelines:
+            self.governor.record_latency("capture", captured - start)
+        self.governor.record_latency(("match", template_filename, "occurrences"), time.time() - captured)
+
+        h, w = template.shape[:2]
+        found = [((x + w // 2, y + h // 2), score) for score, (x, y) in peaks]
+        if self.log.enabled(logging.DEBUG):
+            self.log.event(device, f"Occurrences {template_filename}", time.time() - start, logging.DEBUG,
+                           count=len(found))
+        return found
+
+    def _next_frame(self, device):
+        pipeline = self.pipelines.get(device)
+        if pipeline is None:
+            return self._capture(device)
+        return pipeline.frame()
+
+    def _prefetch(self, device):
+        start = time.time()
+        img = self._capture(device)
+        if img is not None:
+            self.governor.record_latency("capture", time.time() - start)
+        return img
+
+    def _act(self, device, func, wait=False):
+        pipeline = self.pipelines.get(device)
+        if pipeline is None:
+            return func()
+        return pipeline.act(func, wait)
+
+    def _match_slot(self, device):
+        if not self.governor_enabled:
+            return contextlib.nullcontext()
+        return self.governor.match_slot(self.in_progress.get(device, False))
+
+    def _poll_interval(self, device, interval):
+        if not self.governor_enabled:
+            return interval
+        return self.governor.poll_interval(interval, self.in_progress.get(device, False))
+
+    def _get_anti_ban_params(self):
+        if not self.anti_ban_enabled:
+            return {
+                'position_offset': 0,
+                'delay_before': 0.1,
+                'delay_after': 0.2,
+                'action_delay': 0.5
+            }
+        
+        if self.anti_ban_level == 1:
+            return {
+                'position_offset': random.randint(0, 5),
+                'delay_before': random.uniform(0.1, 0.3),
+                'delay_after': random.uniform(0.2, 0.4),
+                'action_delay': random.uniform(0.5, 1.0)
+            }
+        elif self.anti_ban_level == 2:
+            return {
+                'position_offset': random.randint(3, 10),
+                'delay_before': random.uniform(0.2, 0.5),
+                'delay_after': random.uniform(0.3, 0.6),
+                'action_delay': random.uniform(1.0, 2.0)
+            }
+        else:
+            return {
+                'position_offset': random.randint(8, 15),
+                'delay_before': random.uniform(0.3, 0.8),
+                'delay_after': random.uniform(0.5, 1.0),
+                'action_delay': random.uniform(2.0, 3.0)
+            }
+
+    def _click_position(self, device, position):
+        if position is None:
+            return False
+        self._check_abort(device)
+        self.in_progress[device] = True
+        x, y = position
+        
+        params = self._get_anti_ban_params()
+        
+        x, y = self._jitter((x, y), params)
+        
+        return self._act(device, lambda: self._tap(device, x, y, params))
+
+    def _tap(self, device, x, y, params):
+        time.sleep(params['delay_before'])
+        
+        self.last_activity_time = time.time()
+        self.activity_pattern.append((x, y, self.last_activity_time))
+        if len(self.activity_pattern) > 10:
+            self.activity_pattern.pop(0)
+        
+        result = self._run_adb("-s", device, "shell", "input", "tap", str(x), str(y))
+        
+        time.sleep(params['delay_after'])
+        
+        return result is not None
+
+    def _jitter(self, position, params):
+        x, y = position
+        x += random.randint(-params['position_offset'], params['position_offset'])
+        y += random.randint(-params['position_offset'], params['position_offset'])
+        return x, y
+
+    def _tap_sequence(self, device, steps):
+        self._check_abort(device)
+        self.in_progress[device] = True
+        return self._act(device, lambda: self._send_tap_sequence(device, steps), wait=True)
+
+    def _send_tap_sequence(self, device, steps):
+        commands = []
+        total_wait = 0.0
+        params = self._get_anti_ban_params()
+        time.sleep(params['delay_before'])
+        for index, (action, value) in enumerate(steps):
+            if commands:
+                commands.append(";")
+            if action == "tap":
+                params = self._get_anti_ban_params()
+                x, y = self._jitter(value, params)
+                self.last_activity_time = time.time()
+                self.activity_pattern.append((x, y, self.last_activity_time))
+                if len(self.activity_pattern) > 10:
+                    self.activity_pattern.pop(0)
+                commands += ["input", "tap", str(x), str(y), ";", "echo", f"step{index}=$?"]
+            else:
+                seconds = value + (params['delay_after'] + params['delay_before'] if self.anti_ban_enabled else 0)
+                total_wait += seconds
+                commands += ["sleep", f"{seconds:.2f}", ";", "echo", f"step{index}=$?"]
+        
+        result = self._adb_call("-s", device, "shell", *commands, timeout=total_wait + 5)
+        codes = {}
+        for line in (result.output or "").splitlines():
+            key, _, code = line.strip().partition("=")
+            if key.startswith("step") and key[4:].isdigit():
+                codes[int(key[4:])] = code == "0"
+        time.sleep(params['delay_after'])
+        return [codes.get(index, False) for index in range(len(steps))]
+
+    def _wait_for_image(self, device, template_filename, timeout=30, interval=1):
+        start_time = time.time()
+        while time.time() - start_time < timeout and self.running:
+            self._check_abort(device)
+            position = self._find_image(device, template_filename)
+            if position is not None:
+                return position
+            if self._is_offline(device):
+                return None
+                
+            params = self._get_anti_ban_params()
+            actual_interval = self._poll_interval(device, interval) * random.uniform(0.8, 1.2) + params['action_delay']
+            self._pause(device, actual_interval)
+        return None
+
+    def _show_status(self, device, message, level=logging.INFO):
+        now = time.time()
+        last = self.step_times.get(device)
+        self.step_times[device] = now
+        if device in self.device_steps:
+            self.device_steps[device] = (message, now)
+        if message.startswith(("No ", "Fail")):
+            level = max(level, logging.WARNING)
+        self.log.event(device, message, now - last if last else None, level,
+                       ab_level=self.anti_ban_level if self.anti_ban_enabled else None)
+
+    def configure_logging(self, verbosity=None, log_file=None, json_log_file=None):
+        if verbosity is not None:
+            self.log_verbosity = verbosity
+        self.log_file = log_file
+        self.json_log_file = json_log_file
+        old_log = self.log
+        self.log = EventLogger(self.log_verbosity, log_file=log_file, json_file=json_log_file)
+        old_log.stop()
+        print(f"\n{Fore.GREEN}✅ Logging: {self.log_verbosity}"
+              f"{', file ' + log_file if log_file else ''}{', json ' + json_log_file if json_log_file else ''}{Style.RESET_ALL}")
+
+    def _clear_fog_device(self, device):
+        self._show_status(device, "Starting fog clearing process")
+        
+        markers = ["sleep.png", "camp.png", "find.png"] if self.idle_detection else []
+        positions = self._find_all(device, ["home.png", "map.png"] + markers)
+        home_pos = positions["home.png"]
+        map_pos = positions["map.png"]
+        
+        if markers and not self._update_idle_state(device, positions):
+            return None
+        
+        if home_pos:
+            self._show_status(device, "Home found")
+            self._click_position(device, home_pos)
+        elif map_pos:
+            home_pos = self._remembered_position(device, "home.png") if self.batch_taps else None
+            if home_pos:
+                self._show_status(device, "Map found, tapping map + home")
+                if not all(self._tap_sequence(device, [("tap", map_pos), ("wait", 2), ("tap", home_pos)])):
+                    self._show_status(device, "Batched map + home failed, looking again")
+                    positions = self._find_all(device, ["home.png", "map.png"])
+                    home_pos = positions["home.png"]
+                    map_pos = positions["map.png"]
+                    if home_pos:
+                        self._show_status(device, "Home found")
+                        self._click_position(device, home_pos)
+                    elif not map_pos:
+                        self._show_status(device, "No home/map")
+                        return False
+            if not home_pos:
+                self._show_status(device, "Map found")
+                self._click_position(device, map_pos)
+                time.sleep(2)
+                home_pos = self._find_image(device, "home.png")
+                if home_pos:
+                    self._show_status(device, "Home after map")
+                    self._click_position(device, home_pos)
+        else:
+            self._show_status(device, "No home/map")
+            return False
+            
+        time.sleep(2)
+        
+        option = self._open_scout_camp(device)
+        if option is None:
+            return False
+            
+        if not self._dispatch_scout(device):
+            return False
+            
+        sent = 1
+        while self.multi_dispatch and sent < self.max_dispatch and self.running:
+            time.sleep(self.batch_delay)
+            if self._open_scout_camp(device, option) is None:
+                break
+            if not self._dispatch_scout(device, explore_timeout=self.batch_explore_timeout):
+                self._show_status(device, "No more scouts, closing camp")
+                self._return_home(device)
+                break
+            sent += 1
+            
+        self._idle(device)['last_dispatch'] = time.time()
+        with self.stats_lock:
+            self._device_stats(device)['scouts'] += sent
+        self._show_status(device, f"Complete ({sent} scout{'s' if sent > 1 else ''} sent)")
+        return True
+
+    def _open_scout_camp(self, device, option=None):
+        options = [option] if option else [f"{i}.png" for i in range(1, 5)]
+        positions = self._find_all(device, options)
+        found = None
+        for name in options:
+            if not self.running: break
+            option_pos = positions[name]
+            if option_pos:
+                self._show_status(device, f"Option {name[:-4]}")
+                self._click_position(device, option_pos)
+                found = name
+                break
+                
+        if found is None:
+            self._show_status(device, "No options")
+            return None
+            
+        time.sleep(2 if option is None else self.batch_delay)
+        
+        scout_pos = self._find_image(device, "scout.png")
+        if scout_pos:
+            self._show_status(device, "Scout found")
+            self._click_position(device, scout_pos)
+        else:
+            self._show_status(device, "No scout")
+        return found
+
+    def _dispatch_scout(self, device, explore_timeout=30):
+        explore_pos = self._wait_for_image(device, "explore.png", timeout=explore_timeout)
+        if not explore_pos:
+            self._show_status(device, "No explore")
+            return False
+            
+        self._show_status(device, "Explore")
+        self._click_position(device, explore_pos)
+        time.sleep(5)
+        
+        positions = self._find_all(device, ["notselected.png", "selected.png"])
+        notselected_pos = positions["notselected.png"]
+        selected_pos = positions["selected.png"]
+        
+        confirm_pos = self._remembered_position(device, "explore.png", "explore.png@confirm") if self.batch_taps else None
+        send_pos = None
+        if confirm_pos and (notselected_pos or selected_pos):
+            steps = [("tap", confirm_pos)]
+            if notselected_pos:
+                steps = [("tap", notselected_pos), ("wait", 1)] + steps
+            self._show_status(device, "Selecting + explore again" if notselected_pos else "Already set, explore again")
+            if all(self._tap_sequence(device, steps)):
+                send_pos = self._wait_for_image(device, "send.png")
+            if send_pos is None:
+                self._show_status(device, "Batched explore missed, looking again")
+        
+        if send_pos is None:
+            if notselected_pos and not confirm_pos:
+                self._show_status(device, "Selecting")
+                self._click_position(device, notselected_pos)
+            elif selected_pos and not confirm_pos:
+                self._show_status(device, "Already set")
+            elif not notselected_pos and not selected_pos:
+                self._show_status(device, "No selection")
+            
+            explore_pos = self._find_image(device, "explore.png", memory_key="explore.png@confirm")
+            if not explore_pos:
+                self._show_status(device, "No explore after select")
+                return False
+                
+            self._show_status(device, "Explore again")
+            self._click_position(device, explore_pos)
+            
+            send_pos = self._wait_for_image(device, "send.png")
+            
+        if not send_pos:
+            self._show_status(device, "No send button")
+            return False
+            
+        self._show_status(device, "Sending")
+        self._click_position(device, send_pos)
+        
+        home_pos = self._wait_for_image(device, "home.png")
+        if home_pos:
+            self._show_status(device, "Return home")
+            self._click_position(device, home_pos)
+        else:
+            self._show_status(device, "No home after send")
+        return True
+
+    def _idle(self, device):
+        return self.idle_state.setdefault(device, {
+            'busy_checks': 0,
+            'next_check': 0,
+            'last_dispatch': None,
+            'return_time': None
+        })
+
+    def _update_idle_state(self, device, positions):
+        state = self._idle(device)
+        now = time.time()
+        idle = positions.get("sleep.png") is not None
+        busy = positions.get("camp.png") is not None or positions.get("find.png") is not None
+        
+        if idle or not busy:
+            if idle and state['busy_checks'] and state['last_dispatch']:
+                sample = now - state['last_dispatch']
+                state['return_time'] = sample if state['return_time'] is None else state['return_time'] * 0.7 + sample * 0.3
+            state['busy_checks'] = 0
+            state['next_check'] = 0
+            return True
+        
+        state['busy_checks'] += 1
+        delay = min(self.idle_backoff_max, self.idle_backoff_base * 2 ** (state['busy_checks'] - 1))
+        if state['return_time'] and state['last_dispatch']:
+            expected = state['last_dispatch'] + state['return_time'] - now
+            if expected > self.idle_backoff_base:
+                delay = min(self.idle_backoff_max, expected)
+        state['next_check'] = now + delay
+        self._show_status(device, f"Scouts busy, next check in {int(delay)}s")
+        return False
+
+    def _wait_for_idle_scout(self, devices):
+        next_check = min(self._idle(device)['next_check'] for device in devices)
+        wait = next_check - time.time()
+        if wait <= 0:
+            return
+        print(f"\n{Fore.YELLOW}💤 All scouts busy, waiting {int(wait)}s{Style.RESET_ALL}")
+        while self.running and time.time() < next_check:
+            time.sleep(min(1, next_check - time.time()))
+
+    def _device_stats(self, device):
+        with self.stats_lock:
+            return self.device_stats.setdefault(device, {
+                'runs': 0,
+                'success': 0,
+                'failed': 0,
+                'recoveries': 0,
+                'watchdog': 0,
+                'scouts': 0,
+                'skipped': 0,
+                'game_events': 0
+            })
+
+    def _success_rate(self, device):
+        stats = self._device_stats(device)
+        return stats['success'] / stats['runs'] * 100 if stats['runs'] else 0.0
+
+    def _check_abort(self, device):
+        event = self.abort_events.get(device)
+        if event is not None and event.is_set():
+            raise StepAborted(device)
+
+    def _pause(self, device, seconds):
+        event = self.abort_events.get(device)
+        if event is None:
+            time.sleep(seconds)
+        elif event.wait(seconds):
+            raise StepAborted(device)
+
+    def _on_game_event(self, device, kind):
+        if kind == GAME_FOREGROUND:
+            self.game_events.pop(device, None)
+            return
+        if device in self.recovering:
+            return
+        self.game_events[device] = kind
+        event = self.abort_events.get(device)
+        if device in self.device_steps and event is not None and not event.is_set():
+            event.set()
+            with self.stats_lock:
+                self._device_stats(device)['game_events'] += 1
+            message = "Game exited" if kind == GAME_DIED else "Game went to background"
+            self._show_status(device, f"{message}, aborting current step", logging.WARNING)
+
+    def _return_home(self, device):
+        for _ in range(3):
+            positions = self._find_all(device, ["home.png", "map.png"])
+            if positions["home.png"] or positions["map.png"]:
+                return True
+            self._act(device, lambda: self._run_adb("-s", device, "shell", "input", "keyevent", "4"))
+            time.sleep(1)
+        return False
+
+    def _recover(self, device, attempt):
+        stats = self._device_stats(device)
+        with self.stats_lock:
+            stats['recoveries'] += 1
+        self.recovering.add(device)
+        try:
+            game_event = self.game_events.pop(device, None)
+            if game_event == GAME_BACKGROUND:
+                self._show_status(device, "Recovery: bringing game to foreground")
+                if self._open_game_device(device, wait_ready=True) and self._return_home(device):
+                    return True
+            elif game_event is None and attempt == 1:
+                self._show_status(device, "Recovery: back to home")
+                if self._return_home(device):
+                    return True
+            self._show_status(device, "Recovery: restarting game")
+            self._restart_game_device(device)
+            return self._return_home(device)
+        finally:
+            self.recovering.discard(device)
+
+    def _run_device(self, device):
+        stats = self._device_stats(device)
+        if time.time() < self._idle(device)['next_check']:
+            with self.stats_lock:
+                stats['skipped'] += 1
+            return True
+        event = self.abort_events.setdefault(device, threading.Event())
+        ok = False
+        for attempt in range(self.max_retries + 1):
+            if not self.running:
+                return False
+            event.clear()
+            self.in_progress[device] = False
+            self.device_steps[device] = ("Starting", time.time())
+            self._start_pipeline(device)
+            try:
+                if attempt > 0 or device in self.game_events:
+                    self._recover(device, attempt)
+                ok = self._clear_fog_device(device)
+            except StepAborted:
+                ok = False
+            finally:
+                self._stop_pipeline(device, discard=ok is False)
+                self.device_steps.pop(device, None)
+                event.clear()
+            if ok is None:
+                with self.stats_lock:
+                    stats['skipped'] += 1
+                return True
+            if ok:
+                break
+            if self._is_offline(device):
+                self._show_status(device, "Device offline, skipping retries")
+                break
+            if attempt < self.max_retries:
+                self._show_status(device, f"Retrying ({attempt + 1}/{self.max_retries})")
+        with self.stats_lock:
+            stats['runs'] += 1
+            stats['success' if ok else 'failed'] += 1
+        return ok
+
+    def _start_pipeline(self, device):
+        if self.pipelined:
+            pipeline = DevicePipeline(lambda: self._prefetch(device))
+            pipeline.start()
+            self.pipelines[device] = pipeline
+
+    def _stop_pipeline(self, device, discard=False):
+        pipeline = self.pipelines.pop(device, None)
+        if pipeline is None:
+            return
+        pipeline.stop(discard)
+        stats = pipeline.stats
+        if self.log.enabled(logging.DEBUG):
+            self.log.event(device, "Pipeline stopped", level=logging.DEBUG,
+                           captured=stats['captured'], served=stats['served'], dropped=stats['dropped'],
+                           prefetched=stats['prefetched'], frame_wait=stats['wait'])
+
+    def _watchdog(self, stop_event):
+        while not stop_event.wait(1):
+            now = time.time()
+            for device, (step, since) in list(self.device_steps.items()):
+                event = self.abort_events.get(device)
+                if event is None or event.is_set() or now - since < self.step_timeout:
+                    continue
+                event.set()
+                with self.stats_lock:
+                    self._device_stats(device)['watchdog'] += 1
+                self._show_status(device, f"Watchdog - stuck at '{step}' for {int(now - since)}s", logging.ERROR)
+
+    def clear_fog(self):
+        if not self.connected_devices:
+            print(f"\n{Fore.RED}⚠️ No devices connected!{Style.RESET_ALL}")
+            return False
+        
+        self.current_run_count += 1
+        self.running = True
+
+        if self.rest_interval > 0 and self.current_run_count % self.rest_interval == 0:
+            rest_msg = f"💤 Resting for {self.rest_duration}s (Run {self.current_run_count}/{self.max_repeats if self.max_repeats > 0 else '∞'})"
+            print(f"\n{Fore.YELLOW}{rest_msg}{Style.RESET_ALL}")
+            time.sleep(self.rest_duration)
+        
+        if self.idle_detection:
+            self._wait_for_idle_scout(self.connected_devices)
+        
+        if self.event_stream:
+            self.game_monitor.sync(self.connected_devices)
+        
+        stop_event = threading.Event()
+        watchdog = threading.Thread(target=self._watchdog, args=(stop_event,), daemon=True)
+        watchdog.start()
+        try:
+            devices = list(self.connected_devices)
+            if self.parallel_devices and len(devices) > 1:
+                workers = [threading.Thread(target=self._run_device, args=(device,), daemon=True)
+                           for device in devices]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+            else:
+                for device in devices:
+                    if not self.running:
+                        self._show_status(device, "Stopped by user")
+                        break
+                    self._run_device(device)
+        finally:
+            stop_event.set()
+            watchdog.join()
+        
+        for device in self.connected_devices:
+            stats = self._device_stats(device)
+            print(f"{Fore.CYAN}📈 {device[:5]}...: {stats['success']}/{stats['runs']} ok ({self._success_rate(device):.0f}%), {stats['recoveries']} recoveries{Style.RESET_ALL}")
+        
+        return self.running
+
+    def _port_open(self, port, timeout=0.2):
+        try:
+            with socket.create_connection((self.probe_host, port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+
+    def discover_devices(self):
+        for port in self.probe_ports:
+            if self._port_open(port):
+                self._run_adb("connect", f"{self.probe_host}:{port}")
+
+    def _dedupe_devices(self, devices):
+        serials = set(devices)
+        unique = []
+        for device in devices:
+            host, _, port = device.rpartition(":")
+            if host == self.probe_host and port.isdigit() and f"emulator-{int(port) - 1}" in serials:
+                continue
+            unique.append(device)
+        return unique
+
+    def scan_devices(self):
+        self._animate_loading("Scanning devices")
+        self.discover_devices()
+        devices = self._dedupe_devices(self.adb.devices())
+        if devices:
+            self.all_devices = devices
+        return self.all_devices
+
+    def connect_devices(self, selection):
+        if not self.all_devices:
+            self.scan_devices()
+            if not self.all_devices:
+                return False
+
+        if selection.lower() == 'all':
+            self.connected_devices = self.all_devices.copy()
+            return True
+
+        try:
+            indexes = {int(x)-1 for x in selection.replace('+', ' ').split() if x.isdigit()}
+            self.connected_devices = [self.all_devices[i] for i in indexes if 0 <= i < len(self.all_devices)]
+            return bool(self.connected_devices)
+        except:
+            return False
+
+    def disconnect_devices(self, selection):
+        if not self.connected_devices:
+            return False
+
+        if selection.lower() == 'all':
+            self.connected_devices = []
+            return True
+
+        try:
+            indexes = {int(x)-1 for x in selection.replace('+', ' ').split() if x.isdigit()}
+            self.connected_devices = [d for i, d in enumerate(self.connected_devices) if i not in indexes]
+            return True
+        except:
+            return False
+
+    def show_devices(self):
+        if not self.all_devices:
+            self.scan_devices()
+        
+        print(f"\n{Fore.GREEN}📋 Connected Devices:{Style.RESET_ALL}")
+        for i, dev in enumerate(self.all_devices, 1):
+            status = f"{Fore.GREEN}✓ Connected{Style.RESET_ALL}" if dev in self.connected_devices else f"{Fore.RED}✗ Disconnected{Style.RESET_ALL}"
+            print(f"  {i}. {dev[:12]}... - {status}")
+            
+        print(f"\n{Fore.YELLOW}🛡️ Anti-Ban Status:{Style.RESET_ALL}")
+        ab_status = f"{Fore.GREEN}ENABLED (Level {self.anti_ban_level}){Style.RESET_ALL}" if self.anti_ban_enabled else f"{Fore.RED}DISABLED{Style.RESET_ALL}"
+        print(f"  Status: {ab_status}")
+        print(f"  Last Activity: {time.strftime('%H:%M:%S', time.localtime(self.last_activity_time))}")
+        
+        if self.activity_pattern:
+            print(f"  Activity Pattern: {len(self.activity_pattern)} actions recorded")
+        
+        if self.device_stats:
+            print(f"\n{Fore.YELLOW}📈 Run Statistics:{Style.RESET_ALL}")
+            for dev, stats in self.device_stats.items():
+                print(f"  {dev[:12]}... - {stats['success']}/{stats['runs']} ok ({self._success_rate(dev):.0f}%), "
+                      f"{stats['recoveries']} recoveries, {stats['watchdog']} watchdog, {stats['scouts']} scouts sent, "
+                      f"{stats['skipped']} skipped (busy), {stats['game_events']} game events")
+        
+        if self.start_times:
+            print(f"\n{Fore.YELLOW}🚀 Game Start Times:{Style.RESET_ALL}")
+            for dev, times in self.start_times.items():
+                cold = f"{sum(times['cold']) / len(times['cold']):.1f}s" if times['cold'] else "-"
+                warm = f"{sum(times['warm']) / len(times['warm']):.1f}s" if times['warm'] else "-"
+                print(f"  {dev[:12]}... - cold {cold} | warm {warm}")
+        
+        if self.governor_enabled:
+            load = self.governor.status()
+            cpu = f"{load['cpu']:.0f}%" if load['cpu'] is not None else "n/a"
+            print(f"\n{Fore.YELLOW}🌡️ Host Load:{Style.RESET_ALL}")
+            print(f"  CPU {cpu} | poll x{load['scale']:.2f} | match workers {load['workers']} "
+                  f"({load['active']} active, {load['waiting']} waiting)")
+        
+        if self.event_stream and self.game_monitor.states:
+            print(f"\n{Fore.YELLOW}🎮 Game Events:{Style.RESET_ALL}")
+            for dev, (kind, since) in self.game_monitor.states.items():
+                print(f"  {dev[:12]}... - {kind} ({int(time.time() - since)}s ago)")
+        
+        adb_stats = self.adb.stats()
+        if adb_stats:
+            print(f"\n{Fore.YELLOW}📡 ADB Dispatch:{Style.RESET_ALL}")
+            for dev, stats in adb_stats.items():
+                print(f"  {dev[:12]}... - port {stats['port']} | queued {stats['queued']} | {stats['calls']} calls | "
+                      f"wait avg {stats['avg_wait'] * 1000:.0f}ms max {stats['max_wait'] * 1000:.0f}ms")
+
+    def _game_running(self, device, package_name=None):
+        output = self._run_adb("-s", device, "shell", "pidof", package_name or self.package_name)
+        return bool(output)
+
+    def _game_focused(self, device, package_name=None):
+        output = self._run_adb("-s", device, "shell", "dumpsys", "window", "|", "grep", "-E", "'mCurrentFocus|mFocusedApp'")
+        return bool(output) and (package_name or self.package_name) in output
+
+    def _launch_game(self, device, package_name=None):
+        package_name = package_name or self.package_name
+        cold = not self._game_running(device, package_name)
+        self._show_status(device, "Attempting to open game")
+        output = self._run_adb("-s", device, "shell", "monkey", "-p", package_name, "-c", "android.intent.category.LAUNCHER", "1")
+        if output is None:
+            self._show_status(device, "Failed to open game")
+            return None
+        return cold
+
+    def _wait_game_ready(self, device, launched_at, cold, package_name=None):
+        deadline = launched_at + self.ready_timeout
+        while time.time() < deadline:
+            self._check_abort(device)
+            if self._game_focused(device, package_name):
+                break
+            self._keep_step_alive(device)
+            self._pause(device, self._poll_interval(device, 1))
+        else:
+            self._show_status(device, "Failed to bring game to foreground")
+            return None
+        
+        self._show_status(device, "Game in foreground, waiting for home screen")
+        while time.time() < deadline:
+            positions = self._find_all(device, ["home.png", "map.png"])
+            if positions["home.png"] or positions["map.png"]:
+                duration = time.time() - launched_at
+                kind = 'cold' if cold else 'warm'
+                with self.stats_lock:
+                    times = self.start_times.setdefault(device, {'cold': [], 'warm': []})[kind]
+                    times.append(duration)
+                    del times[:-20]
+                self.game_events.pop(device, None)
+                self._show_status(device, f"Game ready ({kind} start {duration:.1f}s)")
+                return duration
+            self._keep_step_alive(device)
+            self._pause(device, self._poll_interval(device, 2))
+        self._show_status(device, "Failed to reach home screen")
+        return None
+
+    def _keep_step_alive(self, device):
+        step = self.device_steps.get(device)
+        if step is not None:
+            self.device_steps[device] = (step[0], time.time())
+
+    def _open_game_device(self, device, package_name=None, wait_ready=False):
+        launched_at = time.time()
+        cold = self._launch_game(device, package_name)
+        if cold is None:
+            return False
+        if wait_ready:
+            return self._wait_game_ready(device, launched_at, cold, package_name) is not None
+        self._show_status(device, "Game opened successfully")
+        return True
+
+    def _restart_game_device(self, device, package_name=None):
+        self._close_game_device(device, package_name)
+        time.sleep(1)
+        return self._open_game_device(device, package_name, wait_ready=True)
+
+    def _close_game_device(self, device, package_name=None):
+        package_name = package_name or self.package_name
+        self._show_status(device, "Attempting to close game")
+        output = self._run_adb("-s", device, "shell", "am", "force-stop", package_name)
+        if output is None:
+            self._show_status(device, "Failed to close game")
+            return False
+        self._show_status(device, "Game closed successfully")
+        return True
+
+    def open_game(self, package_name="com.rok.gp.vn", wait_ready=False):
+        if not self.connected_devices:
+            print(f"\n{Fore.RED}⚠️ No devices connected!{Style.RESET_ALL}")
+            return False
+        
+        if not wait_ready:
+            success = True
+            for device in self.connected_devices:
+                if not self._open_game_device(device, package_name):
+                    success = False
+            return success
+        
+        launches = []
+        for device in self.connected_devices:
+            launched_at = time.time()
+            cold = self._launch_game(device, package_name)
+            if cold is not None:
+                launches.append((device, launched_at, cold))
+        
+        success = len(launches) == len(self.connected_devices)
+        for device, launched_at, cold in launches:
+            if self._wait_game_ready(device, launched_at, cold, package_name) is None:
+                success = False
+        return success
+
+    def restart_game(self, package_name="com.rok.gp.vn"):
+        if not self.close_game(package_name):
+            return False
+        time.sleep(1)
+        return self.open_game(package_name, wait_ready=True)
+
+    def close_game(self, package_name="com.rok.gp.vn"):
+        if not self.connected_devices:
+            print(f"\n{Fore.RED}⚠️ No devices connected!{Style.RESET_ALL}")
+            return False
+        
+        success = True
+        for device in self.connected_devices:
+            if not self._close_game_device(device, package_name):
+                success = False
+        return success
+
+    def set_anti_ban(self, enabled=None, level=None):
+        if enabled is not None:
+            self.anti_ban_enabled = enabled
+            status = "ON" if enabled else "OFF"
+            color = Fore.GREEN if enabled else Fore.RED
+            print(f"\n{color}✅ Anti-ban {status}{Style.RESET_ALL}")
+            
+        if level is not None and 1 <= level <= 3:
+            self.anti_ban_level = level
+            levels = {1: "Low", 2: "Medium", 3: "High"}
+            print(f"\n{Fore.GREEN}✅ Anti-ban level set to {levels[level]}{Style.RESET_ALL}")
+            
+        if enabled is None and level is None:
+            print(f"\n{Fore.YELLOW}Current Anti-ban status:{Style.RESET_ALL}")
+            print(f"  Enabled: {self.anti_ban_enabled}")
+            print(f"  Level: {self.anti_ban_level}")
+
+    def set_recording(self, enabled):
+        if enabled and self.recorder is None:
+            self.recorder = FrameRecorder()
+            self.recorder.start()
+        elif not enabled and self.recorder is not None:
+            recorder = self.recorder
+            self.recorder = None
+            recorder.stop()
+            print(f"\n{Fore.CYAN}📼 Recorded {recorder.recorded} frames, dropped {recorder.dropped}{Style.RESET_ALL}")
+        status = "ON" if enabled else "OFF"
+        print(f"\n{Fore.GREEN}✅ Debug recorder {status}{Style.RESET_ALL}")
+
+    def set_event_stream(self, enabled):
+        self.event_stream = enabled
+        if enabled:
+            self.game_monitor.sync(self.connected_devices)
+        else:
+            self.game_monitor.stop()
+            self.game_events.clear()
+        status = "ON" if enabled else "OFF"
+        print(f"\n{Fore.GREEN}✅ Game event stream {status}{Style.RESET_ALL}")
+
+    def set_match_engine(self, engine):
+        if engine not in ("opencv", "fft"):
+            return False
+        self.match_engine = engine
+        print(f"\n{Fore.GREEN}✅ Match engine set to {engine}{Style.RESET_ALL}")
+        return True
+
+    def print_banner(self):
+        os.system('cls' if os.name == 'nt' else 'clear')
+        print(f"{Fore.BLUE}{self.banner}{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}⋆｡ﾟ✶°  {self.name} Controller  °✶ﾟ｡⋆{Style.RESET_ALL}\n")
+
+def run_menu(controller):
+    while True:
+        controller.print_banner()
+        
+        conn_status = f"{Fore.GREEN}Connected: {len(controller.connected_devices)}/{len(controller.all_devices)}{Style.RESET_ALL}" if controller.all_devices else f"{Fore.RED}No devices found{Style.RESET_ALL}"
+        
+        ab_status = f"{Fore.GREEN}ON (Lv{controller.anti_ban_level}){Style.RESET_ALL}" if controller.anti_ban_enabled else f"{Fore.RED}OFF{Style.RESET_ALL}"
+        
+        print(f"{Fore.CYAN}📊 Status: {conn_status} | 🛡️ Anti-Ban: {ab_status}\n")
+        
+        print(f"{Fore.CYAN}1. {Fore.WHITE}📋 Show Devices & Status")
+        print(f"{Fore.CYAN}2. {Fore.WHITE}🔌 Connect Devices")
+        print(f"{Fore.CYAN}3. {Fore.WHITE}❌ Disconnect Devices")
+        print(f"{Fore.CYAN}4. {Fore.WHITE}🎮 Open Game")
+        print(f"{Fore.CYAN}5. {Fore.WHITE}🛑 Close Game")
+        print(f"{Fore.CYAN}6. {Fore.WHITE}🌫️ Clear Fog")
+        print(f"{Fore.CYAN}7. {Fore.WHITE}🛡️ Configure Anti-Ban")
+        print(f"{Fore.CYAN}8. {Fore.WHITE}⚙️ Advanced Settings")
+        print(f"{Fore.CYAN}9. {Fore.WHITE}🚪 Exit")
+        
+        choice = input(f"\n{Fore.YELLOW}👉 Your choice (1-9): {Style.RESET_ALL}").strip()
+        
+        if choice == "1":
+            controller.show_devices()
+            
+        elif choice == "2":
+            controller.scan_devices()
+            if controller.all_devices:
+                controller.show_devices()
+                selection = input(f"\n{Fore.YELLOW}👉 Select devices (1, 1+2+3, all): {Style.RESET_ALL}")
+                if controller.connect_devices(selection):
+                    print(f"\n{Fore.GREEN}✅ Devices connected successfully!{Style.RESET_ALL}")
+                    controller.show_devices()
+                else:
+                    print(f"\n{Fore.RED}❌ Invalid selection{Style.RESET_ALL}")
+            else:
+                print(f"\n{Fore.RED}⚠️ No devices detected{Style.RESET_ALL}")
+                
+        elif choice == "3":
+            if controller.connected_devices:
+                print(f"\n{Fore.GREEN}📋 Currently connected devices:{Style.RESET_ALL}")
+                for i, dev in enumerate(controller.connected_devices, 1):
+                    print(f"  {i}. {dev[:12]}...")
+                
+                selection = input(f"\n{Fore.YELLOW}👉 Select devices to disconnect (1, 1+2+3, all): {Style.RESET_ALL}")
+                if controller.disconnect_devices(selection):
+                    print(f"\n{Fore.GREEN}✅ Devices disconnected successfully!{Style.RESET_ALL}")
+                    controller.show_devices()
+                else:
+                    print(f"\n{Fore.RED}❌ Invalid selection{Style.RESET_ALL}")
+            else:
+                print(f"\n{Fore.RED}⚠️ No devices currently connected{Style.RESET_ALL}")
+                
+        elif choice == "4":
+            controller.open_game(wait_ready=True)
+            
+        elif choice == "5":
+            controller.close_game()
+            
+        elif choice == "6":
+            try:
+                max_repeats = int(input(f"\n{Fore.YELLOW}👉 Number of runs (0 for unlimited): {Style.RESET_ALL}"))
+                controller.max_repeats = max_repeats
+                
+                if controller.max_repeats > 0:
+                    rest_interval = int(input(f"{Fore.YELLOW}👉 Rest after how many runs? (0 for no rest): {Style.RESET_ALL}"))
+                    if rest_interval > 0:
+                        controller.rest_interval = rest_interval
+                        controller.rest_duration = int(input(f"{Fore.YELLOW}👉 Rest duration (seconds): {Style.RESET_ALL}"))
+            except ValueError:
+                print(f"\n{Fore.RED}⚠️ Invalid number!{Style.RESET_ALL}")
+                continue
+                
+            repeat_count = 0
+            while True:
+                if controller.max_repeats > 0 and repeat_count >= controller.max_repeats:
+                    break
+                    
+                success = controller.clear_fog()
+                repeat_count += 1
+                
+                if not success:
+                    break
+                    
+                if controller.max_repeats == 0:
+                    cmd = input(f"\n{Fore.YELLOW}👉 {repeat_count} runs completed. Continue? (y/n/stop): {Style.RESET_ALL}").strip().lower()
+                    if cmd == 'stop':
+                        controller.running = False
+                        break
+                    elif cmd != 'y':
+                        break
+            
+        elif choice == "7":
+            print(f"\n{Fore.YELLOW}🛡️ Anti-Ban Configuration:{Style.RESET_ALL}")
+            print(f"1. {Fore.GREEN}Enable Anti-Ban{Style.RESET_ALL}")
+            print(f"2. {Fore.RED}Disable Anti-Ban{Style.RESET_ALL}")
+            print(f"3. Set Anti-Ban Level (Current: {controller.anti_ban_level})")
+            
+            ab_choice = input(f"{Fore.YELLOW}👉 Your choice (1-3): {Style.RESET_ALL}").strip()
+            
+            if ab_choice == "1":
+                controller.set_anti_ban(enabled=True)
+            elif ab_choice == "2":
+                controller.set_anti_ban(enabled=False)
+            elif ab_choice == "3":
+                level = input(f"{Fore.YELLOW}👉 Set level (1-3, 1=Low, 2=Medium, 3=High): {Style.RESET_ALL}").strip()
+                if level in ['1', '2', '3']:
+                    controller.set_anti_ban(level=int(level))
+                else:
+                    print(f"{Fore.RED}⚠️ Invalid level!{Style.RESET_ALL}")
+            else:
+                print(f"{Fore.RED}⚠️ Invalid choice!{Style.RESET_ALL}")
+            
+        elif choice == "8":
+            print(f"\n{Fore.YELLOW}⚙️ Advanced Settings:{Style.RESET_ALL}")
+            print(f"1. Match Engine (Current: {controller.match_engine})")
+            print(f"2. Max Retries (Current: {controller.max_retries})")
+            print(f"3. Watchdog Step Timeout (Current: {controller.step_timeout}s)")
+            print(f"4. Parallel Devices (Current: {'ON' if controller.parallel_devices else 'OFF'})")
+            print(f"5. Debug Recorder (Current: {'ON' if controller.recorder else 'OFF'})")
+            print(f"6. ADB Servers (Current: {' '.join(map(str, controller.adb_ports))}, max {controller.adb_concurrency} calls each)")
+            print(f"7. Multi-Dispatch (Current: {'ON' if controller.multi_dispatch else 'OFF'}, up to {controller.max_dispatch} scouts)")
+            print(f"8. Idle Detection (Current: {'ON' if controller.idle_detection else 'OFF'})")
+            print(f"9. Logging (Current: {controller.log_verbosity}{', file' if controller.log_file else ''}{', json' if controller.json_log_file else ''})")
+            print(f"10. Batched Taps (Current: {'ON' if controller.batch_taps else 'OFF'})")
+            print(f"11. Load Governor (Current: {'ON' if controller.governor_enabled else 'OFF'})")
+            print(f"12. Game Event Stream (Current: {'ON' if controller.event_stream else 'OFF'})")
+            print(f"13. Pipelined Capture (Current: {'ON' if controller.pipelined else 'OFF'})")
+            
+            adv_choice = input(f"{Fore.YELLOW}👉 Your choice (1-13): {Style.RESET_ALL}").strip()
+            
+            if adv_choice == "1":
+                engine = input(f"{Fore.YELLOW}👉 Set engine (opencv, fft): {Style.RESET_ALL}").strip().lower()
+                if not controller.set_match_engine(engine):
+                    print(f"{Fore.RED}⚠️ Invalid engine!{Style.RESET_ALL}")
+            elif adv_choice in ["2", "3"]:
+                try:
+                    value = int(input(f"{Fore.YELLOW}👉 New value: {Style.RESET_ALL}"))
+                    if value < 0 or (adv_choice == "3" and value < 10):
+                        raise ValueError
+                    if adv_choice == "2":
+                        controller.max_retries = value
+                    else:
+                        controller.step_timeout = value
+                    print(f"\n{Fore.GREEN}✅ Setting updated{Style.RESET_ALL}")
+                except ValueError:
+                    print(f"{Fore.RED}⚠️ Invalid number!{Style.RESET_ALL}")
+            elif adv_choice == "4":
+                controller.parallel_devices = not controller.parallel_devices
+                print(f"\n{Fore.GREEN}✅ Parallel devices {'ON' if controller.parallel_devices else 'OFF'}{Style.RESET_ALL}")
+            elif adv_choice == "5":
+                controller.set_recording(controller.recorder is None)
+            elif adv_choice == "6":
+                try:
+                    ports = [int(x) for x in input(f"{Fore.YELLOW}👉 Server ports (e.g. 5037 5041): {Style.RESET_ALL}").split()]
+                    concurrency = int(input(f"{Fore.YELLOW}👉 Max concurrent calls per server: {Style.RESET_ALL}"))
+                    if concurrency < 1:
+                        raise ValueError
+                    controller.configure_adb(ports, concurrency)
+                except ValueError:
+                    print(f"{Fore.RED}⚠️ Invalid number!{Style.RESET_ALL}")
+            elif adv_choice == "7":
+                controller.multi_dispatch = not controller.multi_dispatch
+                print(f"\n{Fore.GREEN}✅ Multi-dispatch {'ON' if controller.multi_dispatch else 'OFF'}{Style.RESET_ALL}")
+            elif adv_choice == "8":
+                controller.idle_detection = not controller.idle_detection
+                print(f"\n{Fore.GREEN}✅ Idle detection {'ON' if controller.idle_detection else 'OFF'}{Style.RESET_ALL}")
+            elif adv_choice == "9":
+                verbosity = input(f"{Fore.YELLOW}👉 Verbosity (quiet, normal, verbose): {Style.RESET_ALL}").strip().lower()
+                if verbosity in ["quiet", "normal", "verbose"]:
+                    to_file = input(f"{Fore.YELLOW}👉 Write log file? (y/n): {Style.RESET_ALL}").strip().lower() == 'y'
+                    to_json = input(f"{Fore.YELLOW}👉 Write JSON lines? (y/n): {Style.RESET_ALL}").strip().lower() == 'y'
+                    controller.configure_logging(verbosity,
+                                                 "logs/clearfog.log" if to_file else None,
+                                                 "logs/events.jsonl" if to_json else None)
+                else:
+                    print(f"{Fore.RED}⚠️ Invalid verbosity!{Style.RESET_ALL}")
+            elif adv_choice == "10":
+                controller.batch_taps = not controller.batch_taps
+                print(f"\n{Fore.GREEN}✅ Batched taps {'ON' if controller.batch_taps else 'OFF'}{Style.RESET_ALL}")
+            elif adv_choice == "11":
+                controller.governor_enabled = not controller.governor_enabled
+                print(f"\n{Fore.GREEN}✅ Load governor {'ON' if controller.governor_enabled else 'OFF'}{Style.RESET_ALL}")
+            elif adv_choice == "12":
+                controller.set_event_stream(not controller.event_stream)
+            elif adv_choice == "13":
+                controller.pipelined = not controller.pipelined
+                print(f"\n{Fore.GREEN}✅ Pipelined capture {'ON' if controller.pipelined else 'OFF'}{Style.RESET_ALL}")
+            else:
+                print(f"{Fore.RED}⚠️ Invalid choice!{Style.RESET_ALL}")
+            
+        elif choice == "9":
+            controller.game_monitor.stop()
+            print(f"\n{Fore.MAGENTA}✨ Goodbye!{Style.RESET_ALL}")
+            break
+            
+        else:
+            print(f"\n{Fore.RED}⚠️ Invalid choice!{Style.RESET_ALL}")
+        
+        input(f"\n{Fore.YELLOW}↵ Press Enter to continue...{Style.RESET_ALL}")
@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+
+from colorama import Fore, Style
+
+VERBOSITY_LEVELS = {
+    "quiet": logging.WARNING,
+    "normal": logging.INFO,
+    "verbose": logging.DEBUG
+}
+
+CLICK_WORDS = ("click", "tap", "press", "select")
+
+
+class ConsoleFormatter(logging.Formatter):
+    def format(self, record):
+        message = record.getMessage()
+        lowered = message.lower()
+        emoji = "⚡" if "start" in lowered else \
+                "✅" if "success" in lowered else \
+                "❌" if "fail" in lowered else \
+                "🔍" if "look" in lowered else \
+                "🔄" if "process" in lowered else \
+                "🛡️" if "anti-ban" in lowered else "⚙️"
+
+        ab_indicator = ""
+        ab_level = getattr(record, 'ab_level', None)
+        if ab_level and any(word in lowered for word in CLICK_WORDS):
+            ab_indicator = f" {Fore.CYAN}[AB-Lv{ab_level}]{Style.RESET_ALL}"
+
+        device = getattr(record, 'device', '') or ''
+        return f"\n{Fore.BLUE}{emoji} {device[:5]}...: {Fore.WHITE}{message}{ab_indicator}{Style.RESET_ALL}"
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        duration = getattr(record, 'duration', None)
+        duration = f" ({duration:.2f}s)" if duration is not None else ""
+        created = self.formatTime(record, "%Y-%m-%d %H:%M:%S")
+        return f"{created} {record.levelname:<7} {getattr(record, 'device', '-')}: {record.getMessage()}{duration}"
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        event = {
+            'time': record.created,
+            'level': record.levelname,
+            'device': getattr(record, 'device', None),
+            'step': record.getMessage(),
+            'duration': getattr(record, 'duration', None)
+        }
+        event.update(getattr(record, 'fields', {}))
+        return json.dumps(event, ensure_ascii=False)
+
+
+class EventLogger:
+    def __init__(self, verbosity="normal", console=True, log_file=None, json_file=None,
+                 max_bytes=5 * 1024 * 1024, backup_count=3):
+        self.level = VERBOSITY_LEVELS.get(verbosity, logging.INFO)
+        self.verbosity = verbosity
+        self.log_file = log_file
+        self.json_file = json_file
+
+        handlers = []
+        if console:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(ConsoleFormatter())
+            handlers.append(handler)
+        for path, formatter in ((log_file, TextFormatter()), (json_file, JsonFormatter())):
+            if not path:
+                continue
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes,
+                                                           backupCount=backup_count, encoding="utf-8")
+            handler.setFormatter(formatter)
+            handlers.append(handler)
+
+        self.queue = queue.SimpleQueue()
+        self.logger = logging.getLogger(f"clearfog.{id(self)}")
+        self.logger.propagate = False
+        self.logger.setLevel(self.level)
+        self.logger.addHandler(logging.handlers.QueueHandler(self.queue))
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers)
+        self.listener.start()
+        self.stopped = False
+        atexit.register(self.stop)
+
+    def enabled(self, level=logging.INFO):
+        return level >= self.level
+
+    def event(self, device, step, duration=None, level=logging.INFO, ab_level=None, **fields):
+        if level < self.level:
+            return
+        self.logger.log(level, step, extra={
+            'device': device,
+            'duration': duration,
+            'ab_level': ab_level,
+            'fields': fields
+        })
+
+    def stop(self):
+        if self.stopped:
+            return
+        self.stopped = True
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        self.logger.handlers.clear()
@@ -0,0 +1,59 @@
+import struct
+
+import cv2
+import numpy as np
+
+RAW_HEADER_SIZES = (16, 12)
+
+# android.graphics.PixelFormat values screencap emits for 4-byte pixels
+PIXEL_CONVERSIONS = {
+    1: cv2.COLOR_RGBA2BGR,  # RGBA_8888
+    2: cv2.COLOR_RGBA2BGR,  # RGBX_8888
+    5: cv2.COLOR_BGRA2BGR   # BGRA_8888
+}
+
+
+def parse_raw_header(data):
+    if len(data) < 12:
+        return None
+    width, height, pixel_format = struct.unpack_from("<III", data)
+    if pixel_format not in PIXEL_CONVERSIONS:
+        return None
+    for header in RAW_HEADER_SIZES:
+        if len(data) == header + width * height * 4:
+            return width, height, header, pixel_format
+    return None
+
+
+class FrameBuffers:
+    def __init__(self, width, height, header, pixel_format, count=2):
+        self.width = width
+        self.height = height
+        self.header = header
+        self.pixel_format = pixel_format
+        self.conversion = PIXEL_CONVERSIONS[pixel_format]
+        self.raws = [bytearray(header + width * height * 4) for _ in range(count)]
+        self.rgbas = [np.frombuffer(raw, np.uint8, count=width * height * 4, offset=header).reshape(height, width, 4)
+                      for raw in self.raws]
+        self.bgr = np.empty((height, width, 3), np.uint8)
+        self.active = 0
+        self.results = {}
+
+    def valid(self, index):
+        width, height, pixel_format = struct.unpack_from("<III", self.raws[index])
+        return width == self.width and height == self.height and pixel_format == self.pixel_format
+
+    def load(self, data):
+        with memoryview(self.raws[self.active]) as view:
+            view[:] = data
+
+    def convert(self):
+        cv2.cvtColor(self.rgbas[self.active], self.conversion, dst=self.bgr)
+        return self.bgr
+
+    def result_buffer(self, key, shape):
+        buffer = self.results.get((key, shape))
+        if buffer is None:
+            buffer = np.empty(shape, np.float32)
+            self.results[(key, shape)] = buffer
+        return buffer
@@ -0,0 +1,110 @@
+import re
+import time
+import atexit
+import threading
+
+GAME_DIED = "died"
+GAME_BACKGROUND = "background"
+GAME_FOREGROUND = "foreground"
+
+DEATH_TAGS = ("am_proc_died", "am_kill", "am_crash", "am_anr")
+FOCUS_TAGS = ("am_focused_activity", "am_set_resumed_activity", "wm_set_resumed_activity")
+
+# "-v threadtime -v epoch": "  1697712345.123  1000  1234 I am_proc_died: [0,4567,com.rok.gp.vn,...]"
+EVENT_LINE = re.compile(r"^\s*(\d+\.\d+)\s+\d+\s+\d+\s+\w\s+(\w+)\s*:\s*\[(.*)\]")
+
+
+def parse_event(line, package_name, since=0.0):
+    match = EVENT_LINE.match(line)
+    if not match or float(match.group(1)) < since:
+        return None
+    _, tag, payload = match.groups()
+    fields = [field.strip() for field in payload.split(",")]
+    if tag in DEATH_TAGS:
+        return GAME_DIED if package_name in fields else None
+    if tag in FOCUS_TAGS:
+        if any(field.split("/")[0] == package_name for field in fields):
+            return GAME_FOREGROUND
+        return GAME_BACKGROUND
+    return None
+
+
+class GameEventMonitor:
+    def __init__(self, adb, package_name, callback, restart_delay=5):
+        self.adb = adb
+        self.package_name = package_name
+        self.callback = callback
+        self.restart_delay = restart_delay
+        self.states = {}
+        self.watchers = {}
+        self.lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def _command(self, device):
+        filters = [f"{tag}:I" for tag in DEATH_TAGS + FOCUS_TAGS]
+        return ["-s", device, "logcat", "-b", "events", "-v", "threadtime", "-v", "epoch", "-T", "1",
+                *filters, "*:S"]
+
+    def _device_time(self, device):
+        output = self.adb.run(["-s", device, "shell", "date", "+%s"])
+        try:
+            return float(output)
+        except (TypeError, ValueError):
+            return None
+
+    def watch(self, device):
+        with self.lock:
+            if device in self.watchers:
+                return
+            watcher = {'stop': threading.Event(), 'proc': None}
+            self.watchers[device] = watcher
+        threading.Thread(target=self._follow, args=(device, watcher), daemon=True).start()
+
+    def unwatch(self, device):
+        with self.lock:
+            watcher = self.watchers.pop(device, None)
+        if watcher is None:
+            return
+        watcher['stop'].set()
+        proc = watcher['proc']
+        if proc is not None:
+            proc.kill()
+
+    def sync(self, devices):
+        for device in set(self.watchers) - set(devices):
+            self.unwatch(device)
+        for device in devices:
+            self.watch(device)
+
+    def stop(self):
+        for device in list(self.watchers):
+            self.unwatch(device)
+
+    def state(self, device):
+        return self.states.get(device)
+
+    def _follow(self, device, watcher):
+        stop = watcher['stop']
+        while not stop.is_set():
+            # -T 1 replays the last buffered event; anything older than the stream start is history
+            since = self._device_time(device)
+            if since is None:
+                stop.wait(self.restart_delay)
+                continue
+            try:
+                proc = self.adb.stream(self._command(device))
+            except OSError:
+                proc = None
+            if proc is not None:
+                watcher['proc'] = proc
+                if stop.is_set():
+                    proc.kill()
+                for line in proc.stdout:
+                    kind = parse_event(line, self.package_name, since)
+                    if kind is None:
+                        continue
+                    self.states[device] = (kind, time.time())
+                    self.callback(device, kind)
+                proc.wait()
+                watcher['proc'] = None
+            stop.wait(self.restart_delay)
@@ -0,0 +1,106 @@
+import os
+import time
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def _read_cpu_percent():
+    if psutil is not None:
+        return psutil.cpu_percent(interval=None)
+    if hasattr(os, "getloadavg"):
+        return min(100.0, os.getloadavg()[0] / (os.cpu_count() or 1) * 100)
+    return None
+
+
+class LoadGovernor:
+    def __init__(self, target_cpu=85.0, latency_factor=2.0, max_scale=4.0, sample_interval=2.0, max_workers=None):
+        self.target_cpu = target_cpu
+        self.latency_factor = latency_factor
+        self.max_scale = max_scale
+        self.sample_interval = sample_interval
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.cpu = None
+        self.scale = 1.0
+        self.workers = self.max_workers
+        self.latency = {}
+        self.baseline = {}
+        self.active = 0
+        self.waiters = []
+        self.counter = itertools.count()
+        self.cond = threading.Condition()
+        self.lock = threading.Lock()
+        self.running = True
+        if psutil is not None:
+            psutil.cpu_percent(interval=None)
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+
+    def record_latency(self, key, duration):
+        with self.lock:
+            ema = self.latency.get(key)
+            ema = duration if ema is None else ema * 0.8 + duration * 0.2
+            self.latency[key] = ema
+            baseline = self.baseline.get(key)
+            self.baseline[key] = ema if baseline is None else min(baseline * 1.001, ema)
+
+    def _latency_pressure(self):
+        with self.lock:
+            ratios = [self.latency[key] / self.baseline[key] for key in self.latency
+                      if self.baseline.get(key)]
+        return max(ratios) / self.latency_factor if ratios else 0.0
+
+    def _sample(self):
+        while self.running:
+            time.sleep(self.sample_interval)
+            self.cpu = _read_cpu_percent()
+            cpu_pressure = self.cpu / self.target_cpu if self.cpu is not None else 0.0
+            pressure = max(cpu_pressure, self._latency_pressure())
+            if pressure > 1.0:
+                self.scale = min(self.max_scale, self.scale * 1.25)
+            else:
+                self.scale = max(1.0, self.scale / 1.25)
+            workers = max(1, int(round(self.max_workers / self.scale)))
+            with self.cond:
+                self.workers = workers
+                self.cond.notify_all()
+
+    def poll_interval(self, interval, in_progress=True):
+        if in_progress:
+            return interval * max(1.0, self.scale / 2)
+        return interval * self.scale
+
+    @contextmanager
+    def match_slot(self, in_progress=True):
+        with self.cond:
+            entry = (0 if in_progress else 1, next(self.counter))
+            heapq.heappush(self.waiters, entry)
+            while self.active >= self.workers or self.waiters[0] != entry:
+                self.cond.wait()
+            heapq.heappop(self.waiters)
+            self.active += 1
+            self.cond.notify_all()
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.active -= 1
+                self.cond.notify_all()
+
+    def status(self):
+        return {
+            'cpu': self.cpu,
+            'scale': self.scale,
+            'workers': self.workers,
+            'active': self.active,
+            'waiting': len(self.waiters)
+        }
@@ -0,0 +1,121 @@
+import cv2
+import numpy as np
+
+
+def find_peaks(result, threshold, template_shape, max_results=None, overlap=0.3):
+    candidates = (result >= threshold) & (result >= cv2.dilate(result, np.ones((3, 3), np.uint8)))
+    ys, xs = np.nonzero(candidates)
+    if ys.size == 0:
+        return []
+    scores = result[ys, xs]
+    order = np.argsort(-scores, kind="stable")
+    h, w = template_shape[:2]
+    area = h * w
+
+    keep = []
+    while order.size and (max_results is None or len(keep) < max_results):
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        inter_w = np.maximum(0, w - np.abs(xs[rest] - xs[best]))
+        inter_h = np.maximum(0, h - np.abs(ys[rest] - ys[best]))
+        inter = inter_w * inter_h
+        order = rest[inter / (2 * area - inter) <= overlap]
+    return [(float(scores[i]), (int(xs[i]), int(ys[i]))) for i in keep]
+
+
+class FFTFrame:
+    def __init__(self, img):
+        data = img.astype(np.float64)
+        if data.ndim == 2:
+            data = data[:, :, None]
+        self.height, self.width, self.channels = data.shape
+        self.fft_shape = (cv2.getOptimalDFTSize(self.height), cv2.getOptimalDFTSize(self.width))
+        self.spectra = np.fft.rfft2(data, s=self.fft_shape, axes=(0, 1))
+
+        integral = np.zeros((self.height + 1, self.width + 1, self.channels))
+        integral[1:, 1:] = data.cumsum(axis=0).cumsum(axis=1)
+        integral_sq = np.zeros_like(integral)
+        integral_sq[1:, 1:] = (data * data).cumsum(axis=0).cumsum(axis=1)
+        self.integral = integral
+        self.integral_sq = integral_sq
+
+    def window_sums(self, integral, h, w):
+        return integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+
+
+class FFTMatcher:
+    def __init__(self):
+        self.templates = {}
+        self.spectra = {}
+
+    def add_template(self, name, template):
+        data = template.astype(np.float64)
+        if data.ndim == 2:
+            data = data[:, :, None]
+        zero_mean = data - data.mean(axis=(0, 1))
+        norm = float(np.sqrt((zero_mean * zero_mean).sum()))
+        self.templates[name] = (zero_mean, norm)
+        self.spectra = {key: value for key, value in self.spectra.items() if key[0] != name}
+
+    def has_template(self, name):
+        return name in self.templates
+
+    def _template_spectrum(self, name, fft_shape):
+        key = (name, fft_shape)
+        spectrum = self.spectra.get(key)
+        if spectrum is None:
+            zero_mean, _ = self.templates[name]
+            spectrum = np.conj(np.fft.rfft2(zero_mean, s=fft_shape, axes=(0, 1)))
+            self.spectra[key] = spectrum
+        return spectrum
+
+    def prepare_frame(self, img):
+        return FFTFrame(img)
+
+    def match(self, frame, name):
+        zero_mean, norm = self.templates[name]
+        h, w, channels = zero_mean.shape
+        if h > frame.height or w > frame.width or channels != frame.channels:
+            return None
+
+        spectrum = self._template_spectrum(name, frame.fft_shape)
+        product = (frame.spectra * spectrum).sum(axis=2)
+        numerator = np.fft.irfft2(product, s=frame.fft_shape)[:frame.height - h + 1, :frame.width - w + 1]
+
+        n = h * w
+        sums = frame.window_sums(frame.integral, h, w)
+        sums_sq = frame.window_sums(frame.integral_sq, h, w)
+        variance = np.maximum((sums_sq - sums * sums / n).sum(axis=2), 0)
+        denominator = np.sqrt(variance) * norm
+
+        result = np.zeros_like(numerator)
+        valid = denominator > 1e-6
+        result[valid] = numerator[valid] / denominator[valid]
+        return result
+
+    def best_match(self, frame, name):
+        result = self.match(frame, name)
+        if result is None:
+            return 0.0, None
+        index = int(np.argmax(result))
+        y, x = divmod(index, result.shape[1])
+        return float(result[y, x]), (x, y)
+
+    def occurrences(self, frame, name, threshold=0.8, max_results=None):
+        result = self.match(frame, name)
+        if result is None:
+            return []
+        return find_peaks(result.astype(np.float32), threshold, self.templates[name][0].shape, max_results)
+
+    def find_all(self, img, names, threshold=0.8, frame=None):
+        if frame is None:
+            frame = self.prepare_frame(img)
+        found = {}
+        for name in names:
+            max_val, max_loc = self.best_match(frame, name)
+            if max_loc is not None and max_val >= threshold:
+                h, w = self.templates[name][0].shape[:2]
+                found[name] = (max_loc[0] + w // 2, max_loc[1] + h // 2)
+            else:
+                found[name] = None
+        return found
@@ -0,0 +1,168 @@
+import time
+import queue
+import threading
+
+import numpy as np
+
+
+class DevicePipeline:
+    def __init__(self, capture, max_age=3.0, max_actions=4, frame_timeout=15.0):
+        self.capture = capture
+        self.max_age = max_age
+        self.frame_timeout = frame_timeout
+        self.actions = queue.Queue(maxsize=max_actions)
+        self.cond = threading.Condition()
+        self.buffers = [None, None, None]
+        self.ready = None
+        self.in_use = None
+        self.failed_at = 0.0
+        self.wanted = True
+        self.capturing = False
+        self.pending = 0
+        self.action_done = 0.0
+        self.running = False
+        self.threads = []
+        self.stats = {
+            'captured': 0,
+            'served': 0,
+            'dropped': 0,
+            'expired': 0,
+            'prefetched': 0,
+            'wait': 0.0,
+            'action_errors': 0
+        }
+
+    def start(self):
+        self.running = True
+        self.threads = [threading.Thread(target=self._capture_stage, daemon=True),
+                        threading.Thread(target=self._action_stage, daemon=True)]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self, discard=False):
+        if discard:
+            self.discard()
+        self.actions.put(None)
+        self.threads[1].join()
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        self.threads[0].join()
+
+    def discard(self):
+        while True:
+            try:
+                item = self.actions.get_nowait()
+            except queue.Empty:
+                return
+            if item is None:
+                self.actions.put(None)
+                return
+            _, done, _ = item
+            with self.cond:
+                self.pending -= 1
+                self.cond.notify_all()
+            done.set()
+
+    def _fresh(self, started, finished):
+        return not self.pending and started >= self.action_done and time.time() - finished <= self.max_age
+
+    def _needs_frame(self):
+        return self.wanted and not self.pending
+
+    def _capture_stage(self):
+        while True:
+            with self.cond:
+                while self.running and not self._needs_frame():
+                    self.cond.wait()
+                if not self.running:
+                    return
+                index = next(i for i in range(len(self.buffers))
+                             if i != self.in_use and (self.ready is None or i != self.ready[0]))
+                self.wanted = False
+                self.capturing = True
+                started = time.time()
+
+            img = self.capture()
+
+            with self.cond:
+                self.capturing = False
+                if img is None:
+                    self.failed_at = started
+                    self.cond.notify_all()
+                    continue
+                buffer = self.buffers[index]
+                if buffer is None or buffer.shape != img.shape:
+                    buffer = self.buffers[index] = np.empty_like(img)
+                np.copyto(buffer, img)
+                if self.ready is not None:
+                    self.stats['dropped'] += 1
+                self.ready = (index, started, time.time())
+                self.stats['captured'] += 1
+                self.cond.notify_all()
+
+    def frame(self, timeout=None):
+        requested = time.time()
+        deadline = requested + (timeout or self.frame_timeout)
+        with self.cond:
+            self.in_use = None
+            self.cond.notify_all()
+            while self.running:
+                if self.ready is not None and self._fresh(*self.ready[1:]):
+                    index, started, _ = self.ready
+                    self.ready = None
+                    self.in_use = index
+                    self.stats['served'] += 1
+                    if started < requested:
+                        self.stats['prefetched'] += 1
+                    self.stats['wait'] += time.time() - requested
+                    # prefetch exactly one frame for the next lookup
+                    self.wanted = True
+                    self.cond.notify_all()
+                    return self.buffers[index]
+                if self.failed_at >= requested:
+                    return None
+                if self.ready is not None and not self.pending:
+                    self.ready = None
+                    self.stats['expired'] += 1
+                if not self.capturing and not self.wanted:
+                    self.wanted = True
+                    self.cond.notify_all()
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self.cond.wait(remaining)
+        return None
+
+    def act(self, func, wait=False):
+        done = threading.Event()
+        box = {}
+        with self.cond:
+            self.pending += 1
+        self.actions.put((func, done, box))
+        if not wait:
+            return True
+        done.wait()
+        if 'error' in box:
+            raise box['error']
+        return box.get('result')
+
+    def _action_stage(self):
+        while True:
+            item = self.actions.get()
+            if item is None:
+                return
+            func, done, box = item
+            try:
+                box['result'] = func()
+            except Exception as e:
+                box['error'] = e
+                self.stats['action_errors'] += 1
+            finally:
+                with self.cond:
+                    self.pending -= 1
+                    self.action_done = time.time()
+                    if not self.pending:
+                        self.wanted = True
+                    self.cond.notify_all()
+                done.set()
@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import queue
+import atexit
+import zipfile
+import threading
+
+import cv2
+import numpy as np
+
+
+def _safe_name(device):
+    return "".join(c if c.isalnum() else "_" for c in device)
+
+
+class FrameRecorder:
+    def __init__(self, root_dir="recordings", max_queue=32, frames_per_archive=200, max_archives=5,
+                 png_compression=3):
+        self.root_dir = root_dir
+        self.max_queue = max_queue
+        self.frames_per_archive = frames_per_archive
+        self.max_archives = max_archives
+        self.png_compression = png_compression
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.recorded = 0
+        self.dropped = 0
+        self.archives = {}
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.running = True
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.queue.put(None)
+        self.thread.join()
+        for archive in self.archives.values():
+            archive['zip'].close()
+        self.archives = {}
+
+    def record(self, device, frame, results, copy=False):
+        if not self.running:
+            return False
+        if self.queue.full():
+            self.dropped += 1
+            return False
+        if copy:
+            frame = frame.copy()
+        try:
+            self.queue.put_nowait((device, time.time(), frame, results))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _writer(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            try:
+                self._write(*item)
+                self.recorded += 1
+            except:
+                self.dropped += 1
+
+    def _open_archive(self, device):
+        device_dir = os.path.join(self.root_dir, _safe_name(device))
+        os.makedirs(device_dir, exist_ok=True)
+        path = os.path.join(device_dir, time.strftime("%Y%m%d_%H%M%S") + f"_{int(time.time() * 1000) % 1000:03d}.zip")
+        archive = {'zip': zipfile.ZipFile(path, "w", zipfile.ZIP_STORED), 'count': 0, 'path': path}
+        self.archives[device] = archive
+
+        archives = sorted(name for name in os.listdir(device_dir) if name.endswith(".zip"))
+        for name in archives[:-self.max_archives]:
+            try:
+                os.remove(os.path.join(device_dir, name))
+            except OSError:
+                pass
+        return archive
+
+    def _write(self, device, timestamp, frame, results):
+        archive = self.archives.get(device)
+        if archive is None or archive['count'] >= self.frames_per_archive:
+            if archive is not None:
+                archive['zip'].close()
+            archive = self._open_archive(device)
+
+        ok, encoded = cv2.imencode(".png", frame, [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression])
+        if not ok:
+            raise ValueError("Cannot encode frame")
+
+        archive['count'] += 1
+        frame_name = f"frame_{archive['count']:06d}.png"
+        meta = {
+            'device': device,
+            'time': timestamp,
+            'frame': frame_name,
+            'results': {name: list(pos) if pos else None for name, pos in results.items()}
+        }
+        archive['zip'].writestr(frame_name, encoded.tobytes())
+        archive['zip'].writestr(frame_name.replace(".png", ".json"), json.dumps(meta))
+
+
+def iter_recordings(path):
+    if os.path.isdir(path):
+        archives = []
+        for root, _, files in os.walk(path):
+            archives.extend(os.path.join(root, name) for name in files if name.endswith(".zip"))
+        archives.sort()
+    else:
+        archives = [path]
+
+    for archive_path in archives:
+        try:
+            archive = zipfile.ZipFile(archive_path)
+        except zipfile.BadZipFile:
+            continue
+        with archive:
+            for name in sorted(archive.namelist()):
+                if not name.endswith(".png"):
+                    continue
+                frame = cv2.imdecode(np.frombuffer(archive.read(name), np.uint8), cv2.IMREAD_COLOR)
+                try:
+                    meta = json.loads(archive.read(name.replace(".png", ".json")))
+                except KeyError:
+                    meta = {}
+                if frame is not None:
+                    yield frame, meta